@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+
+"""
+    Filename: bench_decoder.py
+    Author: Jim Craveiro <jim.craveiro@gmail.com>
+    Date: 10/17/2026
+
+    Microbenchmark comparing the installed frame decoders on bitstamp websocket payloads
+    (payloads.jsonl holds trade, order book and heartbeat frames in the v2 wire format)
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from src.decoder import DECODERS, get_decoder
+
+PAYLOADS   = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'payloads.jsonl')
+ITERATIONS = 20000
+
+"""
+    function that reads the payload file, one websocket frame per line
+    params:
+        path (string) - path to the payload file
+    return:
+        (list) - frames as bytes, the way they come off the websocket
+"""
+def load_payloads(path):
+    with open(path, 'rb') as file:
+        return [line.strip() for line in file if line.strip()]
+
+"""
+    function that times decoding every payload the way Client does: split the frame,
+    then turn trade data into a Trade and anything else into python objects
+    params:
+        decoder (JsonDecoder) - decoder to time
+        payloads (list) - frames to decode
+        iterations (int) - number of passes over payloads
+    return:
+        (float) - nanoseconds per frame
+"""
+def bench(decoder, payloads, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for message in payloads:
+            event, channel, data = decoder.frame(message)
+            if event == 'trade':
+                decoder.trade(data)
+            else:
+                decoder.payload(data)
+    return (time.perf_counter() - start) * 1e9 / (iterations * len(payloads))
+
+def main():
+    parser = argparse.ArgumentParser(description='compare frame decoders on bitstamp payloads')
+    parser.add_argument('--payloads', default=PAYLOADS)
+    parser.add_argument('--iterations', type=int, default=ITERATIONS)
+    parser.add_argument('--json', action='store_true', help='print results as json')
+    args = parser.parse_args()
+
+    payloads = load_payloads(args.payloads)
+    results  = {}
+    for name, (decoder, module) in DECODERS.items():
+        if module == None: continue
+        results[name] = bench(get_decoder(name), payloads, args.iterations)
+
+    if args.json:
+        print(json.dumps({'benchmark': 'decoder', 'ns_per_frame': results}))
+    else:
+        for name, ns in sorted(results.items(), key=lambda item: item[1]):
+            print('{:8} {:10.1f} ns/frame'.format(name, ns))
+
+if __name__ == '__main__': main()
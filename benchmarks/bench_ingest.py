@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+
+"""
+    Filename: bench_ingest.py
+    Author: Jim Craveiro <jim.craveiro@gmail.com>
+    Date: 10/17/2026
+
+    Benchmark of the trade ingest and aggregation hot path: Client.on_trade,
+    RecentTrades.store_trade, run_calculations and remove_old_trades, across
+    window sizes and tracker counts. Each scenario runs in its own process so
+    peak rss is per scenario, and results are printed as json
+"""
+
+import os
+import sys
+import json
+import time
+import resource
+import argparse
+import platform
+import subprocess
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from src.client import Client
+from src.clock import SimulatedClock
+from src.decoder import JsonDecoder
+from src.recent_trades import RecentTrades
+from trade_generator import synthetic_trades, bitstamp_data
+
+WINDOWS        = {'15m': 900, '1h': 3600, '24h': 86400}
+TRACKER_COUNTS = [1, 2, 4, 8]
+RATE           = 5.0
+OPERATIONS     = 20000
+PREFILL_BATCH  = 10000
+
+"""
+    function that summarizes per call timings
+    params:
+        timings (list) - nanoseconds per call
+    return:
+        (dict) - throughput in calls/s and p50/p99 latency in microseconds
+"""
+def summarize(timings):
+    timings = sorted(timings)
+    return {
+        'calls':      len(timings),
+        'throughput': len(timings) / (sum(timings) / 1e9),
+        'p50_us':     timings[len(timings) // 2] / 1e3,
+        'p99_us':     timings[int(len(timings) * 0.99)] / 1e3
+    }
+
+"""
+    function that runs one scenario: fills the longest window with trades at rate,
+    then times each operation against a steady state window
+    params:
+        window (string) - key of WINDOWS, the longest tracker's age
+        trackers (int) - number of trackers, ages spread evenly up to the window
+        rate (float) - trades per second of trade time
+        operations (int) - timed calls per operation
+        order_stats (bool) - enable each tracker's rolling low/high/median
+    return:
+        (dict) - scenario parameters, per operation summaries and peak rss in KB
+"""
+def run_scenario(window, trackers, rate, operations, order_stats=False):
+    age   = WINDOWS[window]
+    clock = SimulatedClock()
+    recent_trades = RecentTrades(clock)
+    for index in range(trackers):
+        recent_trades.add_tracker('tracker {}'.format(index), age * (index + 1) / trackers, order_stats)
+    client = Client({'xrpusd': recent_trades}, connect=False, decoder=JsonDecoder())
+
+    prefill = int(rate * age)
+    trades  = synthetic_trades(rate, prefill + 4 * operations)
+    batch   = []
+    for _ in range(prefill):
+        batch.append(next(trades))
+        if len(batch) == PREFILL_BATCH:
+            recent_trades.store_trades(batch)
+            batch = []
+    recent_trades.store_trades(batch)
+
+    results = {}
+    timer   = time.perf_counter_ns
+
+    data    = [bitstamp_data(next(trades)) for _ in range(operations)]
+    timings = []
+    for item in data:
+        start = timer()
+        client.on_trade('xrpusd', item)
+        timings.append(timer() - start)
+    results['on_trade'] = summarize(timings)
+
+    timings = []
+    for _ in range(operations):
+        trade = next(trades)
+        clock.advance(trade.timestamp)
+        start = timer()
+        recent_trades.store_trade(trade)
+        timings.append(timer() - start)
+    results['store_trade'] = summarize(timings)
+
+    # each timed call below follows one untimed trade, so a steady state window
+    # has about one trade per tracker to expire per call
+    timings = []
+    for _ in range(operations):
+        trade = next(trades)
+        recent_trades.store_trade(trade)
+        clock.advance(trade.timestamp + 1 / rate)
+        start = timer()
+        recent_trades.run_calculations()
+        timings.append(timer() - start)
+    results['run_calculations'] = summarize(timings)
+
+    timings = []
+    for _ in range(operations):
+        trade = next(trades)
+        recent_trades.store_trade(trade)
+        clock.advance(trade.timestamp + 1 / rate)
+        with recent_trades.lock:
+            start = timer()
+            recent_trades.remove_old_trades()
+            timings.append(timer() - start)
+    results['remove_old_trades'] = summarize(timings)
+
+    return {
+        'window':        window,
+        'trackers':      trackers,
+        'rate':          rate,
+        'order_stats':   order_stats,
+        'window_trades': recent_trades.count('tracker {}'.format(trackers - 1)),
+        'operations':    results,
+        'peak_rss_kb':   resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    }
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL,
+                                       cwd=os.path.dirname(os.path.abspath(__file__))).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description='benchmark the trade ingest and aggregation hot path')
+    parser.add_argument('--windows', nargs='+', default=list(WINDOWS), choices=list(WINDOWS))
+    parser.add_argument('--trackers', nargs='+', type=int, default=TRACKER_COUNTS)
+    parser.add_argument('--rate', type=float, default=RATE, help='trades per second of trade time')
+    parser.add_argument('--operations', type=int, default=OPERATIONS, help='timed calls per operation')
+    parser.add_argument('--order-stats', action='store_true', help="enable the trackers' rolling low/high/median")
+    parser.add_argument('--output', help='write the json results to this file instead of stdout')
+    parser.add_argument('--scenario', nargs=2, metavar=('WINDOW', 'TRACKERS'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.scenario:
+        print(json.dumps(run_scenario(args.scenario[0], int(args.scenario[1]), args.rate, args.operations,
+                                      args.order_stats)))
+        return
+
+    scenarios = []
+    for window in args.windows:
+        for trackers in args.trackers:
+            command = [
+                sys.executable, os.path.abspath(__file__), '--scenario', window, str(trackers),
+                '--rate', str(args.rate), '--operations', str(args.operations)
+            ]
+            if args.order_stats: command.append('--order-stats')
+            output = subprocess.check_output(command)
+            scenarios.append(json.loads(output))
+            print('{:>4} window, {} trackers done'.format(window, trackers), file=sys.stderr)
+
+    report = json.dumps({
+        'benchmark': 'ingest',
+        'commit':    git_commit(),
+        'python':    platform.python_version(),
+        'scenarios': scenarios
+    }, indent=2)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(report + '\n')
+    else:
+        print(report)
+
+if __name__ == '__main__': main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+
+"""
+    Filename: bench_sketches.py
+    Author: Jim Craveiro <jim.craveiro@gmail.com>
+    Date: 10/17/2026
+
+    Benchmark of WindowSketch against exact percentiles over long windows: memory, update
+    cost and rank error of the price and trade size percentiles. Trades are replayed from a
+    journal directory, or generated when none is given, and results are printed as json
+"""
+
+import os
+import sys
+import json
+import time
+import bisect
+import argparse
+import platform
+import tracemalloc
+from array import array
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from src.replay import journal_trades
+from src.order_stats import RollingQuantile
+from src.sketches import WindowSketch, PERCENTILES, K, BUCKETS
+from trade_generator import synthetic_trades
+from bench_ingest import git_commit
+
+WINDOWS     = {'24h': 86400, '7d': 604800}
+RATE        = 0.5
+CHECKPOINTS = 5
+
+"""
+    function that measures how far a sketch's answer is from a quantile, in rank
+    params:
+        ordered (list) - the window's exact values, sorted
+        quantile (float) - quantile asked for
+        value (float) - the sketch's answer
+    return:
+        (float) - distance between quantile and the fraction of the window at or below
+                  value, or, when value ties with other values, the nearest rank value can have
+"""
+def rank_error(ordered, quantile, value):
+    low  = bisect.bisect_left(ordered, value)  / len(ordered)
+    high = bisect.bisect_right(ordered, value) / len(ordered)
+    if low <= quantile <= high: return 0.0
+    return min(abs(quantile - low), abs(quantile - high))
+
+"""
+    function that measures the memory a structure holds on to, with tracemalloc
+    params:
+        build (function) - called with no arguments, returns the structure
+    return:
+        (tuple) - (structure, bytes still allocated once it is built)
+"""
+def measure(build):
+    tracemalloc.start()
+    before    = tracemalloc.get_traced_memory()[0]
+    structure = build()
+    after     = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return structure, after - before
+
+"""
+    function that runs one window: feeds every trade to a WindowSketch, timing it, and at
+    evenly spaced checkpoints once the window has filled compares its percentiles to exact
+    ones from the sorted window. memory is measured on the window at the last checkpoint
+    params:
+        trades (list) - Trades, oldest first
+        window (string) - key of WINDOWS
+        k (int) - KLL accuracy parameter
+        buckets (int) - sub-sketches per window
+    return:
+        (dict) - window parameters, update cost, memory and rank errors
+"""
+def run_window(trades, window, k, buckets):
+    age        = WINDOWS[window]
+    timestamps = [trade.timestamp for trade in trades]
+    first      = bisect.bisect_right(timestamps, timestamps[0] + age)
+    if first >= len(trades): raise ValueError('not enough trades to fill a {} window'.format(window))
+    checkpoints = set(first + (len(trades) - 1 - first) * step // max(CHECKPOINTS - 1, 1)
+                      for step in range(CHECKPOINTS))
+
+    sketch  = WindowSketch(age, buckets, k)
+    elapsed = 0
+    errors  = {'price': {quantile: [] for quantile in PERCENTILES},
+               'amount': {quantile: [] for quantile in PERCENTILES}}
+    timer   = time.perf_counter_ns
+    for index, trade in enumerate(trades):
+        start = timer()
+        sketch.update(trade.timestamp, trade.price, trade.amount)
+        sketch.expire(trade.timestamp - age)
+        elapsed += timer() - start
+        if index not in checkpoints: continue
+
+        begin  = bisect.bisect_right(timestamps, trade.timestamp - age)
+        window_trades = trades[begin:index + 1]
+        percentiles   = sketch.percentiles()
+        for field in errors:
+            ordered = sorted(getattr(item, field) for item in window_trades)
+            for quantile, value in getattr(percentiles, field).items():
+                errors[field][quantile].append(rank_error(ordered, quantile, value))
+
+    window_trades = trades[bisect.bisect_right(timestamps, timestamps[-1] - age):]
+    def build_sketch():
+        built = WindowSketch(age, buckets, k)
+        for trade in window_trades:
+            built.update(trade.timestamp, trade.price, trade.amount)
+        return built
+    def build_exact():
+        exact = RollingQuantile(0.5), RollingQuantile(0.5)
+        for trade in window_trades:
+            exact[0].update(trade.price)
+            exact[1].update(trade.amount)
+        return exact
+    built, sketch_bytes = measure(build_sketch)
+    exact, exact_bytes  = measure(build_exact)
+
+    return {
+        'window':        window,
+        'k':             k,
+        'buckets':       buckets,
+        'window_trades': len(window_trades),
+        'update_ns':     elapsed / len(trades),
+        'memory': {
+            'sketch_items':       built.size(),
+            'sketch_bytes':       sketch_bytes,
+            # price and amount columns as TradeBuffer stores them
+            'exact_array_bytes':  len(window_trades) * 2 * array('d').itemsize,
+            # a price and an amount RollingQuantile, what order_stats keeps per quantile
+            'exact_heap_bytes':   exact_bytes
+        },
+        'rank_error': {field: {str(quantile): {'max': max(values), 'mean': sum(values) / len(values)}
+                               for quantile, values in quantiles.items()}
+                       for field, quantiles in errors.items()}
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='benchmark WindowSketch memory and accuracy against exact percentiles')
+    parser.add_argument('--journal', metavar='PATH', help='replay trades from this journal directory')
+    parser.add_argument('--pair', default='xrpusd', help='pair to replay from the journal')
+    parser.add_argument('--windows', nargs='+', default=list(WINDOWS), choices=list(WINDOWS))
+    parser.add_argument('--rate', type=float, default=RATE,
+                        help='trades per second when generating trades, defaults to {}'.format(RATE))
+    parser.add_argument('--k', type=int, default=K)
+    parser.add_argument('--buckets', type=int, default=BUCKETS)
+    parser.add_argument('--output', help='write the json results to this file instead of stdout')
+    args = parser.parse_args()
+
+    longest = max(WINDOWS[window] for window in args.windows)
+    if args.journal:
+        trades = list(journal_trades(args.journal, args.pair))
+        source = 'journal'
+    else:
+        trades = list(synthetic_trades(args.rate, int(args.rate * longest * 1.5)))
+        source = 'synthetic'
+
+    results = []
+    for window in args.windows:
+        results.append(run_window(trades, window, args.k, args.buckets))
+        print('{:>3} window done'.format(window), file=sys.stderr)
+
+    report = json.dumps({
+        'benchmark': 'sketches',
+        'commit':    git_commit(),
+        'python':    platform.python_version(),
+        'source':    source,
+        'trades':    len(trades),
+        'windows':   results
+    }, indent=2)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(report + '\n')
+    else:
+        print(report)
+
+if __name__ == '__main__': main()
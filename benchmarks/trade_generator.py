@@ -0,0 +1,55 @@
+"""
+    Filename: trade_generator.py
+    Author: Jim Craveiro <jim.craveiro@gmail.com>
+    Date: 10/17/2026
+
+    synthetic bitstamp trade generator used by the benchmarks
+"""
+
+import os
+import sys
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from src.trade import Trade
+
+"""
+    function that generates trades arriving as a poisson process around a random walk price
+    params:
+        rate (float) - average trades per second of trade time
+        count (int) - number of trades to generate
+        start (float) - unix time of the first trade, defaults to 1.5e9
+        price (float) - starting price, defaults to 0.5
+        seed (int) - random seed so runs are reproducible, defaults to 0
+    return:
+        (generator) - Trades, oldest first
+"""
+def synthetic_trades(rate, count, start=1.5e9, price=0.5, seed=0):
+    rng = random.Random(seed)
+    timestamp = start
+    for id in range(count):
+        timestamp += rng.expovariate(rate)
+        price     *= 1 + rng.gauss(0, 0.0005)
+        amount     = rng.lognormvariate(5, 1.5)
+        yield Trade(timestamp, round(price, 5), round(amount, 8), rng.randint(0, 1), id)
+
+"""
+    function that turns a trade into the data of a bitstamp v2 trade event
+    params:
+        trade (Trade) - the trade
+    return:
+        (dict) - the event data as JsonDecoder would hand it to Client.on_trade
+"""
+def bitstamp_data(trade):
+    return {
+        'id':             trade.id,
+        'timestamp':      str(int(trade.timestamp)),
+        'microtimestamp': str(int(trade.timestamp * 1e6)),
+        'amount':         trade.amount,
+        'amount_str':     '{:.8f}'.format(trade.amount),
+        'price':          trade.price,
+        'price_str':      '{:.5f}'.format(trade.price),
+        'type':           trade.side,
+        'buy_order_id':   trade.id * 2,
+        'sell_order_id':  trade.id * 2 + 1
+    }
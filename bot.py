@@ -12,80 +12,88 @@ import os
 import sys
 import time
 import json
+import atexit
 import signal
 import curses
+import select
 import logging
-import requests
+import argparse
+import threading
 from src.client import Client
+from src.display import Display
+from src.decoder import JsonDecoder
+from src.clock import WallClock, SimulatedClock
+from src.replay import RecordDecoder, replay, replay_batches, journal_trades, log_trades, record_time, log_time
+from src.journal import Journal
+from src.candles import CandleBuilder
+from src.indicators import Bollinger, RSI
+from src.alerts import AlertEngine, load_rules
+from src.notifier import Notifier, PUSHOVER_URL
+from src.metrics import MetricsServer, METRICS_HOST, METRICS_PORT
+from src.log_queue import QueueWriter, BatchingFileHandler
+from src.order_book import OrderBook
+from src.warm_start import warm_start
 from src.recent_trades import RecentTrades
 
 LOG_PATH            = './log/'
+JOURNAL_PATH        = './log/journal/'
+ALERTS_PATH         = 'alerts.json'
+PAIRS               = ['xrpusd']
+QUOTE_CURRENCIES    = ['usdt', 'usdc', 'usd', 'eur', 'gbp', 'btc', 'eth']
+ONE_DAY             = 86400
 ONE_HOUR            = 3600
 FIFTEEN_MIN         = 900
+MAX_REFRESH_RATE    = 20
+CANDLE_RESOLUTION   = 60
 CREDENTIALS         = {}
-PUSHOVER_URL        = 'https://api.pushover.net/1/messages.json'
-PUSHOVER_RETRIES    = 2
-PUSHOVER_PRIORITY   = {'silent'   :'-2',
-                       'low'      :'-1',
-                       'default'  : '0',
-                       'high'     : '1',
-                       'emergency': '2'}
-PUSHOVER_EMERGENCY_RETRY  = 120
-PUSHOVER_EMERGENCY_EXPIRE = 600
-
-"""
-    function that sends a push notification using the Pushover API, requests,
-    and credentials provided in the credentials.json file. 
-    Pushover documentation can be found here: https://pushover.net/api
+NOTIFIER            = None
+
+"""
+    function that sends a push notification using the Pushover API and credentials
+    provided in the credentials.json file. the notification is only queued, NOTIFIER
+    posts it from its own thread, so this never blocks the caller
     params:
         message (string) - the push notification message body
         title (string) - the title of the push notification,
                          defaults to empty string which lets Pushover use its default
         priority (string) - priority string that corresponds to Pushover priority levels
-                            using PUSHOVER_PRIORITY to convert, defaults to 'default'
-        retries (int) - the number of retries (total attempts - 1) to attempt if the post
-                        request to the Pushover API fails, defaults to PUSHOVER_RETRIES constant
-"""
-def push_notification(message, title='', priority='default', retries=PUSHOVER_RETRIES):
-    payload = {
-        'token'   : CREDENTIALS['pushover']['token'],
-        'user'    : CREDENTIALS['pushover']['user'],
-        'message' : message,
-        'title'   : title,
-        'priority': PUSHOVER_PRIORITY[priority]
-    }
-    if priority == 'emergency':
-        payload['retry']  = PUSHOVER_EMERGENCY_RETRY
-        payload['expire'] = PUSHOVER_EMERGENCY_EXPIRE
-    
-    response = requests.post(PUSHOVER_URL, data=payload)
-    if response.status_code >= 400:
-        logging.getLogger('debug').error('push notification failed on try {}/{} with status code: {}\n    error text: {}\n'.format(
-            (retries - 3) * -1, PUSHOVER_RETRIES + 1, response.status_code, response.text
-        ))
-        if retries > 0: 
-            time.sleep(1)
-            push_notification(message, title, priority, retries-1)
+                            using src.notifier's PUSHOVER_PRIORITY, defaults to 'default'
+        key (hashable) - what repeats are deduped by, see Notifier.notify, defaults to
+                         the message, title and priority
+    return:
+        (bool) - False if the notification was dropped as a repeat or because the queue was full
+"""
+def push_notification(message, title='', priority='default', key=None):
+    return NOTIFIER.notify(message, title, priority, key)
 
 """
     function that creates a very basic logger that appends to a file
     params:
         name (string) - name of the logger
+        queued (bool) - hand records to a background writer that batches and flushes
+                        them instead of writing on the logging thread, defaults to False
 """
-def make_logger(name):
+def make_logger(name, queued=False):
     logger = logging.getLogger(name)
     logger.setLevel(logging.DEBUG)
-    logger.addHandler(logging.FileHandler('{}{}.log'.format(LOG_PATH, name), mode='a'))
+    path = '{}{}.log'.format(LOG_PATH, name)
+    if queued:
+        writer = QueueWriter(BatchingFileHandler(path, mode='a'))
+        atexit.register(writer.stop)
+        logger.addHandler(writer.handler())
+    else:
+        logger.addHandler(logging.FileHandler(path, mode='a'))
 
 """
     function that calculates the uptime of the program and returns an uptime string
     params:
-        start_time (float) - time recorded at start of program
+        start_time (float) - clock.monotonic() recorded at start of program
+        clock (WallClock) - clock the start time was read from
     return:
         (string) - string containing calculated days, hours, minutes, and seconds of uptime
 """
-def calc_uptime(start_time):
-    seconds = int(time.time() - start_time)
+def calc_uptime(start_time, clock):
+    seconds = int(clock.monotonic() - start_time)
     minutes = int(seconds / 60)
     hours   = int(minutes / 60)
     days    = int(hours   / 24)
@@ -105,52 +113,308 @@ def calc_uptime(start_time):
 def on_sigint(signum, frame):
     sys.exit()
 
-def update_display(stdscr, recent_trades, start_time):
-    cursor_pos = 0
-    stdscr.addstr(cursor_pos, 0, 'Bitstamp Pybot - uptime: {}'.format(calc_uptime(start_time))); cursor_pos+=2
-    stdscr.addstr(cursor_pos, 0, 'Current Price: ${} USD'.format(recent_trades.price())); cursor_pos+=2
-    
-    for tracker in recent_trades.trackers():
-        stdscr.addstr(cursor_pos, 0, '{} Trade Volume:  {:.8f} XRP'.format(tracker, recent_trades.volume(tracker))); cursor_pos+=1
-        stdscr.addstr(cursor_pos, 4, 'Price Volume:    ${:.5f} USD'.format(recent_trades.price_volume(tracker))); cursor_pos+=1
-        stdscr.addstr(cursor_pos, 4, 'Average Price:   ${:.5f} USD'.format(recent_trades.average_price(tracker))); cursor_pos+=2
+"""
+    function that splits a bitstamp currency pair into its base and quote currencies
+    params:
+        pair (string) - bitstamp currency pair, e.g. 'xrpusd'
+    return:
+        (tuple) - upper case (base, quote) strings, e.g. ('XRP', 'USD')
+"""
+def split_pair(pair):
+    for quote in QUOTE_CURRENCIES:
+        if pair.endswith(quote) and len(pair) > len(quote):
+            return pair[:-len(quote)].upper(), quote.upper()
+    return pair[:-3].upper(), pair[-3:].upper()
+
+"""
+    function that formats an indicator's value for the display
+    params:
+        value (float or tuple) - Indicator.value(), None until it has enough data
+    return:
+        (string) - the value to 5 places, a tuple's values separated by slashes
+"""
+def format_indicator(value):
+    if value == None: return 'n/a'
+    if isinstance(value, tuple): return '/'.join(['{:.5f}'.format(item) for item in value])
+    return '{:.5f}'.format(value)
+
+"""
+    function that describes a frame of the display; Display only formats and writes
+    the lines whose values changed since the last frame
+    params:
+        display (Display) - the screen to draw on
+        markets (dict) - RecentTrades keyed by currency pair
+        books (dict) - OrderBooks keyed by currency pair
+        candles (dict) - CandleBuilders keyed by currency pair
+        start_time (float) - clock.monotonic() recorded at start of program
+        clock (WallClock) - clock the bot runs on
+"""
+def update_display(display, markets, books, candles, start_time, clock):
+    display.begin('Bitstamp Pybot - uptime: {}', calc_uptime(start_time, clock))
+
+    for pair, recent_trades in markets.items():
+        base, quote = split_pair(pair)
+        snapshot = recent_trades.snapshot()
+        display.line(0, '{}/{} Current Price: {} {}', base, quote, snapshot.price, quote)
+        book = books[pair].snapshot()
+        if book.synced and book.mid != None:
+            display.line(4, 'Bid/Ask: {:.5f}/{:.5f}  Spread: {:.5f}  Mid: {:.5f} {}',
+                         book.bid, book.ask, book.spread, book.mid, quote)
+        else:
+            display.line(4, 'Order book syncing...')
+        candle = candles[pair].live(CANDLE_RESOLUTION)
+        if candle != None:
+            display.line(4, '{} Candle: O {} H {} L {} C {}  Volume: {:.8f} {}',
+                         time.strftime('%H:%M', time.localtime(candle.start)),
+                         candle.open, candle.high, candle.low, candle.close, candle.volume, base)
+        display.line()
+
+        for name, tracker in snapshot.trackers.items():
+            display.line(0, '{} Trade Volume:  {:.8f} {}', name, tracker.volume, base)
+            display.line(4, 'Price Volume:    {:.5f} {}', tracker.price_volume, quote)
+            display.line(4, 'Average Price:   {:.5f} {}', tracker.average_price, quote)
+            display.line(4, 'VWAP:            {:.5f} {}', tracker.vwap, quote)
+            display.line(4, 'Buy/Sell Volume: {:.8f}/{:.8f} {}', tracker.buy_volume, tracker.sell_volume, base)
+            display.line(4, 'Buys/Sells:      {}/{}  Imbalance: {:+.3f}',
+                         tracker.buy_count, tracker.sell_count, tracker.imbalance)
+            for indicator, value in tracker.indicators.items():
+                display.line(4, '{:<17}{}', indicator + ':', format_indicator(value))
+            if tracker.percentiles != None:
+                price, amount = tracker.percentiles.price, tracker.percentiles.amount
+                display.line(4, 'Price p5/p50/p95: {:.5f}/{:.5f}/{:.5f} {}', price[0.05], price[0.5], price[0.95], quote)
+                display.line(4, 'Size p50/p95/p99: {:.8f}/{:.8f}/{:.8f} {}', amount[0.5], amount[0.95], amount[0.99], base)
+            display.line()
     
-    stdscr.refresh()
+    display.end()
 
 """
-    function that sets up the signal handler for sigint, 
-    reads in credentials, and sets up loggers
+    function that sets up the signal handlers for sigint and sigterm,
+    reads in credentials, sets up the logger, notifier and trade journal, loads the alert
+    rules in ALERTS_PATH if there is one, and creates a RecentTrades (warm started from the
+    journal, watched by the alerts), CandleBuilder and OrderBook for every pair in PAIRS
+    params:
+        clock (WallClock) - clock the bot runs on
+        updated (threading.Event) - event every RecentTrades and OrderBook sets when it changes
+    return:
+        (tuple) - (RecentTrades, OrderBooks and CandleBuilders keyed by currency pair, Journal)
 """
-#TODO: update comments
-def init():
-    curses.curs_set(0)
+def init(clock, updated):
     signal.signal(signal.SIGINT, on_sigint)
+    signal.signal(signal.SIGTERM, on_sigint)
     
-    global CREDENTIALS
+    global CREDENTIALS, NOTIFIER
     with open('credentials.json', 'r') as file:
         CREDENTIALS = json.loads(file.read())
     
     if not os.path.exists(LOG_PATH): os.mkdir(LOG_PATH)
-    make_logger('debug')
-    make_logger('trades')
+    make_logger('debug', queued=True)
+
+    pushover = CREDENTIALS['pushover']
+    NOTIFIER = Notifier(pushover['token'], pushover['user'], pushover.get('url', PUSHOVER_URL))
+    atexit.register(NOTIFIER.stop)
     
-    recent_trades = RecentTrades()
-    recent_trades.add_tracker('15 Min', FIFTEEN_MIN)
-    recent_trades.add_tracker('1 Hour', ONE_HOUR)
-    return recent_trades    
+    alerts = AlertEngine(push_notification)
+    if os.path.exists(ALERTS_PATH): alerts.add_rules(load_rules(ALERTS_PATH))
+
+    markets = make_markets(PAIRS, clock, updated)
+    books   = {}
+    candles = {}
+    for pair, recent_trades in markets.items():
+        candles[pair] = CandleBuilder()
+        candles[pair].watch(recent_trades)
+        warm_start(recent_trades, pair, JOURNAL_PATH)
+        alerts.watch(pair, recent_trades)
+        books[pair] = OrderBook(pair, updated=updated)
+
+    journal = Journal(JOURNAL_PATH)
+    atexit.register(journal.close)
+    return markets, books, candles, journal
+
+"""
+    function that creates a RecentTrades with the bot's trackers and indicators for every pair
+    params:
+        pairs (list) - bitstamp currency pairs
+        clock (WallClock) - clock the RecentTrades expire trades with
+        updated (threading.Event) - event shared by the RecentTrades, defaults to one each
+    return:
+        (dict) - RecentTrades keyed by currency pair
+"""
+def make_markets(pairs, clock, updated=None):
+    markets = {}
+    for pair in pairs:
+        recent_trades = RecentTrades(clock, updated)
+        recent_trades.add_tracker('15 Min', FIFTEEN_MIN, order_stats=True)
+        recent_trades.add_tracker('1 Hour', ONE_HOUR, order_stats=True)
+        recent_trades.add_indicator('1 Hour', 'Bollinger', Bollinger())
+        recent_trades.add_indicator('1 Hour', 'RSI', RSI())
+        recent_trades.add_tracker('24 Hour', ONE_DAY, sketch=True)
+        markets[pair] = recent_trades
+    return markets
+
+"""
+    function that works out how long the main loop can sleep before it has to redraw
+    without being woken: until the uptime ticks over or the next trade ages out of a window
+    params:
+        markets (dict) - RecentTrades keyed by currency pair
+        start_time (float) - clock.monotonic() recorded at start of program
+        clock (WallClock) - clock the bot runs on
+    return:
+        (float) - seconds to wait
+"""
+def next_timeout(markets, start_time, clock):
+    timeout = 1 - (clock.monotonic() - start_time) % 1
+    now = clock.time()
+    for recent_trades in markets.values():
+        timeout = min(timeout, recent_trades.snapshot().expires - now)
+    return max(timeout, 0)
+
+"""
+    function that sleeps until a trade or order book change is published (or something else
+    sets updated) or the next timeout, coalescing bursts of updates so it returns at most
+    MAX_REFRESH_RATE times a second, then expires old trades and publishes every market
+    params:
+        markets (dict) - RecentTrades keyed by currency pair
+        start_time (float) - clock.monotonic() recorded at start of program
+        clock (WallClock) - clock the bot runs on
+        updated (threading.Event) - event every RecentTrades and OrderBook sets when it changes
+        last_update (float) - clock.monotonic() when this last returned
+"""
+def wait_for_update(markets, start_time, clock, updated, last_update):
+    updated.wait(next_timeout(markets, start_time, clock))
+    wait = 1.0 / MAX_REFRESH_RATE - (clock.monotonic() - last_update)
+    if wait > 0: clock.sleep(wait)
+    updated.clear()
+
+    for recent_trades in markets.values():
+        recent_trades.run_calculations()
+
+"""
+    function run on a daemon thread that wakes the main loop when a key is pressed,
+    then waits for the main loop to read the keys before watching stdin again
+    params:
+        updated (threading.Event) - event the main loop waits on
+        keys_read (threading.Event) - set by the main loop once it has read the pending keys
+"""
+def watch_input(updated, keys_read):
+    while True:
+        select.select([sys.stdin], [], [])
+        keys_read.clear()
+        updated.set()
+        keys_read.wait()
 
 """
     function where main loop is held, calls init and creates the client
-    wrapped in curses wrapper for output
+    wrapped in curses wrapper for output.
+    the loop redraws whenever wait_for_update returns, a key press sets updated too
 """
 def main(stdscr):
-    start_time = time.time()
-    recent_trades = init()
-    client = Client(recent_trades)
+    clock = WallClock()
+    start_time = clock.monotonic()
+    updated = threading.Event()
+    markets, books, candles, journal = init(clock, updated)
+    client = Client(markets, books, journal=journal)
+
+    curses.curs_set(0)
+    stdscr.nodelay(True)
+    stdscr.keypad(True)
+    display   = Display(stdscr)
+    keys_read = threading.Event()
+    input_thread = threading.Thread(target=watch_input, args=(updated, keys_read))
+    input_thread.daemon = True
+    input_thread.start()
     
+    last_draw = 0
     while True:
-        recent_trades.run_calculations()
-        update_display(stdscr, recent_trades, start_time)
-        time.sleep(1)
+        wait_for_update(markets, start_time, clock, updated, last_draw)
+        key = stdscr.getch()
+        while key != -1:
+            display.handle_key(key)
+            key = stdscr.getch()
+        keys_read.set()
+
+        update_display(display, markets, books, candles, start_time, clock)
+        last_draw = clock.monotonic()
+
+"""
+    function where the main loop is held when running without a terminal, e.g. under
+    systemd or in a container. instead of drawing, every update is serialized for
+    the metrics server, which answers scrapes from those cached bytes
+    params:
+        args (Namespace) - parsed command line arguments
+"""
+def run_headless(args):
+    clock = WallClock()
+    start_time = clock.monotonic()
+    updated = threading.Event()
+    markets, books, candles, journal = init(clock, updated)
+    metrics = MetricsServer(markets, args.metrics_host, args.metrics_port)
+    metrics.start()
+    atexit.register(metrics.stop)
+    client = Client(markets, books, journal=journal)
+
+    last_publish = 0
+    while True:
+        wait_for_update(markets, start_time, clock, updated, last_publish)
+        metrics.publish(clock.monotonic() - start_time)
+        last_publish = clock.monotonic()
+
+"""
+    function that replays recorded trades through Client.on_trade instead of connecting
+    to bitstamp, with a simulated clock so trackers expire trades by trade time,
+    then prints what every tracker ended up with. with --batch journal trades are
+    stored in batches, skipping Client.on_trade
+    params:
+        args (Namespace) - parsed command line arguments
+"""
+def run_replay(args):
+    clock   = SimulatedClock()
+    markets = make_markets(args.pairs, clock)
+    start   = time.monotonic()
+    if os.path.isfile(args.replay):
+        client = Client(markets, connect=False, decoder=JsonDecoder())
+        count  = replay(client, {args.pairs[0]: log_trades(args.replay)}, clock, log_time, args.speed)
+    else:
+        sources = {pair: journal_trades(args.replay, pair) for pair in args.pairs}
+        if args.batch:
+            count  = replay_batches(markets, sources, clock, args.batch)
+        else:
+            client = Client(markets, connect=False, decoder=RecordDecoder())
+            count  = replay(client, sources, clock, record_time, args.speed)
+    elapsed = time.monotonic() - start
+    print('replayed {} trades in {:.2f}s ({:.0f} trades/s)'.format(count, elapsed, count / max(elapsed, 1e-9)))
+
+    for pair, recent_trades in markets.items():
+        base, quote = split_pair(pair)
+        snapshot = recent_trades.snapshot()
+        print('{}/{} Last Price: {} {}'.format(base, quote, snapshot.price, quote))
+        for name, tracker in snapshot.trackers.items():
+            print('    {} Trade Volume: {:.8f} {}  Price Volume: {:.5f} {}  Average Price: {:.5f} {}  VWAP: {:.5f} {}'.format(
+                name, tracker.volume, base, tracker.price_volume, quote, tracker.average_price, quote, tracker.vwap, quote
+            ))
+            print('        Buy/Sell Volume: {:.8f}/{:.8f} {}  Buys/Sells: {}/{}  Imbalance: {:+.3f}'.format(
+                tracker.buy_volume, tracker.sell_volume, base, tracker.buy_count, tracker.sell_count, tracker.imbalance
+            ))
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Python 3 Bitstamp trading bot')
+    parser.add_argument('--headless', action='store_true',
+                        help='run without curses and serve metrics over http instead')
+    parser.add_argument('--metrics-host', default=METRICS_HOST,
+                        help='address the headless metrics server binds, defaults to {}'.format(METRICS_HOST))
+    parser.add_argument('--metrics-port', type=int, default=METRICS_PORT,
+                        help='port the headless metrics server binds, defaults to {}'.format(METRICS_PORT))
+    parser.add_argument('--replay', metavar='PATH',
+                        help='replay a journal directory or an old trades.log instead of connecting')
+    parser.add_argument('--speed', type=float, default=None,
+                        help='replay at this multiple of real time, defaults to as fast as possible')
+    parser.add_argument('--batch', type=int, default=None,
+                        help='store journal trades in batches of this size, skipping Client.on_trade')
+    parser.add_argument('--pairs', nargs='+', default=PAIRS,
+                        help='currency pairs to replay, a trades.log is replayed as the first one')
+    return parser.parse_args()
 
-if __name__ == '__main__': curses.wrapper(main)
+if __name__ == '__main__':
+    args = parse_args()
+    if args.replay: run_replay(args)
+    elif args.headless: run_headless(args)
+    else: curses.wrapper(main)
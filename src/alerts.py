@@ -0,0 +1,223 @@
+"""
+    Filename: alerts.py
+    Author: Jim Craveiro <jim.craveiro@gmail.com>
+    Date: 10/17/2026
+
+    AlertEngine class used to evaluate price and volume alert rules against RecentTrades snapshots
+"""
+
+import json
+import bisect
+import threading
+from collections import namedtuple
+from src.notifier import PUSHOVER_PRIORITY
+
+# metrics a rule can watch: the pair's last price, a TrackerSnapshot field, or
+# 'deviation', the percentage a tracker's average price is off its reference tracker's
+TRACKER_METRICS = ['volume', 'price_volume', 'average_price', 'count', 'vwap', 'buy_volume',
+                   'sell_volume', 'buy_count', 'sell_count', 'imbalance']
+METRICS         = ['price', 'deviation'] + TRACKER_METRICS
+# directions a rule fires in: 'above' when the value rises past the threshold,
+# 'below' when it falls past it, 'crosses' for either
+DIRECTIONS      = ['above', 'below', 'crosses']
+MESSAGE         = '{pair} {label} {direction} {threshold:g}: {value:.8g}'
+
+Rule = namedtuple('Rule', ['pair', 'metric', 'tracker', 'reference', 'direction', 'threshold',
+                           'message', 'title', 'priority'])
+
+"""
+    function that builds the rules described by one entry of an alerts file, e.g.
+        {"pair": "xrpusd", "metric": "volume", "tracker": "1 Hour", "above": 1000000}
+        {"pair": "xrpusd", "metric": "price", "crosses": 0.5}
+        {"pair": "xrpusd", "metric": "deviation", "tracker": "15 Min", "reference": "1 Hour", "beyond": 2}
+    "beyond": Z is shorthand for above Z and below -Z. "message" (formatted as described in
+    AlertEngine.message), "title" and "priority" are optional
+    params:
+        config (dict) - the entry
+    return:
+        (list) - Rules
+"""
+def parse_rule(config):
+    metric = config['metric']
+    if metric not in METRICS: raise ValueError('unknown alert metric: {}'.format(metric))
+    if metric != 'price' and 'tracker' not in config:
+        raise ValueError('{} alerts need a tracker'.format(metric))
+    if metric == 'deviation' and 'reference' not in config:
+        raise ValueError('deviation alerts need a reference tracker')
+
+    thresholds = [(direction, config[direction]) for direction in DIRECTIONS if direction in config]
+    if 'beyond' in config:
+        thresholds += [('above', abs(config['beyond'])), ('below', -abs(config['beyond']))]
+    if not thresholds: raise ValueError('alert on {} has no threshold'.format(metric))
+    priority = config.get('priority', 'default')
+    if priority not in PUSHOVER_PRIORITY: raise ValueError('unknown alert priority: {}'.format(priority))
+
+    return [Rule(config['pair'], metric, config.get('tracker'), config.get('reference'), direction,
+                 float(threshold), config.get('message', MESSAGE), config.get('title', ''),
+                 priority) for direction, threshold in thresholds]
+
+"""
+    function that reads an alerts file, a json list of rule entries (see parse_rule)
+    params:
+        path (string) - path of the file
+    return:
+        (list) - Rules
+"""
+def load_rules(path):
+    with open(path, 'r') as file:
+        return [rule for config in json.loads(file.read()) for rule in parse_rule(config)]
+
+"""
+    function that reads a rule's metric out of a snapshot
+    params:
+        snapshot (Snapshot) - RecentTrades snapshot
+        metric (string) - one of METRICS
+        tracker (string) - tracker name, unused for 'price'
+        reference (string) - reference tracker name, only used for 'deviation'
+    return:
+        (float) - the value, None while it isn't defined (no trades yet, or a tracker missing)
+"""
+def metric_value(snapshot, metric, tracker, reference):
+    if metric == 'price':
+        price = float(snapshot.price)
+        return price if snapshot.version > 0 and price != 0.0 else None
+    current = snapshot.trackers.get(tracker)
+    if current == None: return None
+    if metric == 'deviation':
+        base = snapshot.trackers.get(reference)
+        if base == None or current.count == 0 or base.count == 0: return None
+        return (current.average_price / base.average_price - 1) * 100
+    return float(getattr(current, metric))
+
+"""
+    class used to hold every rule watching one metric, sorted by threshold, with the
+    metric's last value. a change from one value to another can only cross the thresholds
+    between them, which bisection finds in O(log n) however many rules there are
+"""
+class Thresholds():
+
+    def __init__(self):
+        self.levels = []
+        self.rules  = {}
+        self.value  = None
+
+    def add(self, rule):
+        if rule.threshold not in self.rules:
+            bisect.insort(self.levels, rule.threshold)
+            self.rules[rule.threshold] = []
+        self.rules[rule.threshold].append(rule)
+
+    """
+        moves the metric to a new value
+        params:
+            value (float) - the new value, None while it isn't defined
+        return:
+            (list) - Rules whose threshold the move crossed in their direction
+    """
+    def update(self, value):
+        last, self.value = self.value, value
+        if last == None or value == None or last == value: return []
+        rising = value > last
+        low, high = (last, value) if rising else (value, last)
+        # thresholds t with low < t <= high: rising past t ends at or over it,
+        # falling past it ends under it
+        begin = bisect.bisect_right(self.levels, low)
+        end   = bisect.bisect_right(self.levels, high)
+        fired = []
+        for threshold in self.levels[begin:end]:
+            for rule in self.rules[threshold]:
+                if rule.direction == 'crosses' or (rule.direction == 'above') == rising:
+                    fired.append(rule)
+        return fired
+
+"""
+    class used to evaluate alert rules incrementally. rules are grouped by pair and then by
+    the metric they watch, each group a Thresholds; on every snapshot only the pair's
+    distinct metrics are read, and only the rules whose threshold lies between a metric's
+    old and new value are looked at, so the cost per trade doesn't grow with the rule count.
+    rules are edge triggered: a rule fires when its threshold is crossed and can only fire
+    again once the value has crossed back
+"""
+class AlertEngine():
+
+    """
+        params:
+            notify (function) - called with (message, title, priority, key) for every fired rule,
+                e.g. bot.push_notification. key identifies the rule (see key()), so repeats of
+                a flapping rule are deduped even though their messages carry the value
+    """
+    def __init__(self, notify):
+        self.notify   = notify
+        self.pairs    = {}
+        self.versions = {}
+        self.lock     = threading.Lock()
+
+    """
+        params:
+            rule (Rule) - rule to evaluate from the next snapshot of its pair on
+    """
+    def add_rule(self, rule):
+        with self.lock:
+            metrics = self.pairs.setdefault(rule.pair, {})
+            key     = (rule.metric, rule.tracker, rule.reference)
+            if key not in metrics: metrics[key] = Thresholds()
+            metrics[key].add(rule)
+
+    def add_rules(self, rules):
+        for rule in rules:
+            self.add_rule(rule)
+
+    """
+        starts evaluating a pair's rules on every snapshot its RecentTrades publishes,
+        taking the current snapshot as the starting values so nothing fires for the
+        state the bot started in
+        params:
+            pair (string) - bitstamp currency pair
+            recent_trades (RecentTrades) - the pair's trades
+    """
+    def watch(self, pair, recent_trades):
+        self.evaluate(pair, recent_trades.snapshot())
+        recent_trades.add_listener(lambda snapshot, trades: self.evaluate(pair, snapshot))
+
+    """
+        moves every metric the pair's rules watch to its value in snapshot and notifies
+        for each rule crossed. snapshots older than one already evaluated are skipped, the
+        websocket thread and the main loop can publish out of order
+        params:
+            pair (string) - bitstamp currency pair
+            snapshot (Snapshot) - RecentTrades snapshot
+        return:
+            (list) - (Rule, value) for every rule that fired
+    """
+    def evaluate(self, pair, snapshot):
+        metrics = self.pairs.get(pair)
+        if not metrics: return []
+        fired = []
+        with self.lock:
+            if snapshot.version <= self.versions.get(pair, -1): return []
+            self.versions[pair] = snapshot.version
+            for (metric, tracker, reference), thresholds in metrics.items():
+                value = metric_value(snapshot, metric, tracker, reference)
+                for rule in thresholds.update(value):
+                    fired.append((rule, value))
+        for rule, value in fired:
+            self.notify(self.message(rule, value), rule.title, rule.priority, self.key(rule))
+        return fired
+
+    """
+        return:
+            (tuple) - what identifies a rule's notifications: its pair, metric, trackers,
+                      direction and threshold
+    """
+    def key(self, rule):
+        return ('alert', rule.pair, rule.metric, rule.tracker, rule.reference, rule.direction, rule.threshold)
+
+    """
+        formats a fired rule's message with the rule's fields, the value that crossed and
+        label, the metric prefixed with its tracker, e.g. '1 Hour volume'
+    """
+    def message(self, rule, value):
+        fields = rule._asdict()
+        fields['value'] = value
+        fields['label'] = rule.metric if rule.tracker == None else '{} {}'.format(rule.tracker, rule.metric)
+        return rule.message.format(**fields)
@@ -0,0 +1,211 @@
+"""
+    Filename: candles.py
+    Author: Jim Craveiro <jim.craveiro@gmail.com>
+    Date: 10/17/2026
+
+    CandleBuilder class used to build OHLCV candles at several resolutions from a pair's trades
+"""
+
+import threading
+from array import array
+from collections import namedtuple
+
+# bar lengths in seconds, finest first, each has to divide the next
+RESOLUTIONS = [1, 60, 300, 3600]
+# closed bars kept per resolution
+HISTORY     = 1440
+
+Candle = namedtuple('Candle', ['start', 'open', 'high', 'low', 'close', 'volume', 'price_volume', 'count'])
+FIELDS = len(Candle._fields)
+
+"""
+    function that merges a later bar into an earlier one in place
+    params:
+        bar (list) - earlier bar, fields in Candle order
+        later (list) - bar covering the time after bar
+"""
+def merge(bar, later):
+    if later[2] > bar[2]: bar[2] = later[2]
+    if later[3] < bar[3]: bar[3] = later[3]
+    bar[4]  = later[4]
+    bar[5] += later[5]
+    bar[6] += later[6]
+    bar[7] += later[7]
+
+"""
+    class used to hold the bars of one resolution: the open bar as a list, updated in place,
+    and the last size closed bars in one preallocated array used as a ring, FIELDS doubles
+    per bar. bars are only made for periods that had trades, so a quiet period leaves a gap
+    rather than a flat bar
+"""
+class CandleSeries():
+
+    def __init__(self, resolution, size=HISTORY):
+        self.resolution = resolution
+        self.size       = size
+        self.data       = array('d', bytes(8 * FIELDS * size))
+        self.closed     = 0
+        self.current    = None
+
+    def __len__(self):
+        return min(self.closed, self.size)
+
+    def store(self, bar):
+        offset = (self.closed % self.size) * FIELDS
+        self.data[offset:offset + FIELDS] = array('d', bar)
+        self.closed += 1
+
+    """
+        params:
+            index (int) - closed bar to read, 0 is the oldest still held, negative counts from the newest
+        return:
+            (Candle) - the bar
+    """
+    def bar(self, index):
+        if index < 0: index += len(self)
+        if not 0 <= index < len(self): raise IndexError('candle index out of range')
+        offset = ((self.closed - len(self) + index) % self.size) * FIELDS
+        values = self.data[offset:offset + FIELDS]
+        return Candle(*values[:7], int(values[7]))
+
+    """
+        adds a bar of a finer resolution (or a single trade as a one trade bar) to the open bar,
+        starting a new open bar if it falls in a later period. anything older than the open
+        bar's period is merged into it, late trades aren't dropped
+        params:
+            bar (list) - fields in Candle order
+        return:
+            (list) - the bar that was closed to make room, None if there wasn't one
+    """
+    def fold(self, bar):
+        start   = bar[0] - bar[0] % self.resolution
+        current = self.current
+        if current != None and start <= current[0]:
+            merge(current, bar)
+            return None
+        self.current = [start] + bar[1:]
+        if current != None: self.store(current)
+        return current
+
+    """
+        closes the open bar if its period ended before timestamp
+        params:
+            timestamp (float) - unix time
+        return:
+            (list) - the closed bar, None if there wasn't one
+    """
+    def close_before(self, timestamp):
+        current = self.current
+        if current == None or current[0] + self.resolution > timestamp: return None
+        self.store(current)
+        self.current = None
+        return current
+
+"""
+    class used to build OHLCV candles for one pair at every resolution in RESOLUTIONS.
+    a trade only ever updates the open bar of the finest resolution, O(1); when a bar closes
+    it is folded into the open bar of the next resolution, so coarser bars are built from
+    finer ones and trades are never read twice. the open bar of a coarse resolution therefore
+    lags by whatever finer bars are still open, live() merges those back in when it's read.
+    readers take a lock the writer only holds while adding a trade (or a warm start batch),
+    so bars can be read from any thread
+"""
+class CandleBuilder():
+
+    """
+        params:
+            resolutions (list) - bar lengths in seconds, each dividing the next, defaults to RESOLUTIONS
+            history (int) - closed bars kept per resolution, defaults to HISTORY
+    """
+    def __init__(self, resolutions=RESOLUTIONS, history=HISTORY):
+        resolutions = sorted(resolutions)
+        for finer, coarser in zip(resolutions, resolutions[1:]):
+            if coarser % finer: raise ValueError('resolution {} does not divide {}'.format(finer, coarser))
+        self.series = [CandleSeries(resolution, history) for resolution in resolutions]
+        self.levels = {resolution: level for level, resolution in enumerate(resolutions)}
+        self.lock   = threading.Lock()
+
+    """
+        feeds every trade a RecentTrades stores into the builder
+        params:
+            recent_trades (RecentTrades) - the pair's trades
+    """
+    def watch(self, recent_trades):
+        recent_trades.add_listener(lambda snapshot, trades: self.add_trades(trades))
+
+    """
+        closes every open bar whose period ended before timestamp, cascading each closed bar
+        into the next resolution. afterwards every open bar covers timestamp
+        params:
+            timestamp (float) - unix time
+    """
+    def roll(self, timestamp):
+        closed = []
+        for series in self.series:
+            finished = []
+            for bar in closed:
+                bar = series.fold(bar)
+                if bar != None: finished.append(bar)
+            bar = series.close_before(timestamp)
+            if bar != None: finished.append(bar)
+            if not finished: break
+            closed = finished
+
+    """
+        params:
+            trades (list) - Trades, oldest first
+    """
+    def add_trades(self, trades):
+        with self.lock:
+            finest = self.series[0]
+            for trade in trades:
+                self.roll(trade.timestamp)
+                finest.fold([trade.timestamp, trade.price, trade.price, trade.price, trade.price,
+                             trade.amount, trade.amount * trade.price, 1])
+
+    def resolutions(self):
+        return [series.resolution for series in self.series]
+
+    """
+        the open bar of a resolution with the still open finer bars merged in
+        params:
+            resolution (int) - one of the builder's resolutions
+        return:
+            (Candle) - the bar, None before the first trade
+    """
+    def live(self, resolution):
+        with self.lock:
+            return self.live_bar(self.levels[resolution])
+
+    def live_bar(self, level):
+        partial = None
+        for series in self.series[:level + 1]:
+            current = series.current
+            if partial == None:
+                partial = list(current) if current != None else None
+            elif current != None:
+                bar = list(current)
+                merge(bar, partial)
+                partial = bar
+            else:
+                partial[0] -= partial[0] % series.resolution
+        return Candle(*partial) if partial != None else None
+
+    """
+        params:
+            resolution (int) - one of the builder's resolutions
+            count (int) - newest bars to return, defaults to every bar held
+            live (bool) - end with the open bar (see live()), defaults to True
+        return:
+            (list) - Candles, oldest first
+    """
+    def bars(self, resolution, count=None, live=True):
+        with self.lock:
+            level  = self.levels[resolution]
+            series = self.series[level]
+            first  = max(len(series) - count, 0) if count else 0
+            bars   = [series.bar(index) for index in range(first, len(series))]
+            if live:
+                bar = self.live_bar(level)
+                if bar != None: bars.append(bar)
+        return bars[-count:] if count else bars
@@ -2,65 +2,230 @@
     Filename: client.py
     Author: Jim Craveiro <jim.craveiro@gmail.com>
     Date: 1/07/2018
-    
-    Client class for connection to bitstamp/pusher
+
+    Client class for connection to bitstamp's v2 websocket api
 """
 
 import json
+import asyncio
 import logging
-import pusherclient
+import threading
+import websockets
+from functools import partial
+from src.decoder import get_decoder
 
-BITSTAMP_PUSHER_KEY = 'de504dc5763aeef9ff52'
+BITSTAMP_WS_URL     = 'wss://ws.bitstamp.net'
+HEARTBEAT_INTERVAL  = 15
+HEARTBEAT_TIMEOUT   = 45
+RECONNECT_DELAY     = 1
+RECONNECT_MAX_DELAY = 60
 
 """
-    class used to control connection to bitstamp/pusher
+    class used to control the connection to bitstamp's v2 websocket api.
+    subscriptions, heartbeats and reconnects all run as tasks on one asyncio
+    event loop, which lives in a single background thread when started with connect=True
 """
 class Client():
 
     """
-        init function sets up the connection to bitstamp/pusher
+        init function registers a trade subscription for every pair and an order book
+        subscription for every book and, unless told otherwise, starts the event loop
+        thread that connects to bitstamp. every pair shares the one connection
+        params:
+            markets (dict) - RecentTrades to store each pair's trades in, keyed by
+                bitstamp currency pair, e.g. {'xrpusd': RecentTrades()}
+            books (dict) - OrderBooks to keep up to date, keyed by currency pair,
+                defaults to no order books
+            url (string) - websocket url, defaults to BITSTAMP_WS_URL
+            connect (bool) - start the connection thread, defaults to True
+            decoder (JsonDecoder) - frame decoder, defaults to the fastest one installed
+            journal (Journal) - journal to record trades in, defaults to not recording them
+    """
+    def __init__(self, markets, books=None, url=BITSTAMP_WS_URL, connect=True, decoder=None, journal=None):
+        self.markets   = markets
+        self.decoder   = decoder if decoder != None else get_decoder()
+        self.journal   = journal
+        self.books     = books if books != None else {}
+        self.fetching  = set()
+        self.debug     = logging.getLogger('debug')
+        self.url       = url
+        self.channels  = {}
+        self.websocket = None
+        self.loop      = None
+        self.thread    = None
+        self.running   = True
+        for pair in markets:
+            self.subscribe('live_trades_{}'.format(pair), [
+                { 'event': 'trade',
+                  'callback': partial(self.on_trade, pair) }
+            ])
+        for pair in self.books:
+            self.subscribe('diff_order_book_{}'.format(pair), [
+                { 'event': 'data',
+                  'callback': partial(self.on_order_book, pair) }
+            ])
+        if connect: self.start()
+
+    """
+        starts a daemon thread running the client's event loop
+    """
+    def start(self):
+        self.loop   = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_until_complete, args=(self.run(),))
+        self.thread.daemon = True
+        self.thread.start()
+
+    """
+        closes the connection and ends the event loop thread instead of reconnecting
+        params:
+            timeout (float) - longest time to wait for the thread, defaults to HEARTBEAT_INTERVAL
+    """
+    def stop(self, timeout=HEARTBEAT_INTERVAL):
+        self.running = False
+        websocket = self.websocket
+        if websocket != None: asyncio.run_coroutine_threadsafe(websocket.close(), self.loop)
+        if self.thread != None: self.thread.join(timeout)
+
+    """
+        connection loop; connects, subscribes and reads messages until the connection
+        drops or bitstamp asks for a reconnect, then reconnects with exponential backoff
+    """
+    async def run(self):
+        self.loop = asyncio.get_running_loop()
+        delay = RECONNECT_DELAY
+        while self.running:
+            try:
+                async with websockets.connect(self.url, ping_interval=None) as websocket:
+                    self.websocket = websocket
+                    await self.on_connect()
+                    delay = RECONNECT_DELAY
+                    await self.read(websocket)
+            except (OSError, asyncio.TimeoutError, websockets.WebSocketException) as error:
+                self.debug.warning('bitstamp connection lost: {}'.format(error))
+            self.websocket = None
+            if not self.running: break
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, RECONNECT_MAX_DELAY)
+
+    """
+        reads messages off of an open connection while a heartbeat task keeps it alive.
+        a message that fails to decode or whose callback raises is logged and skipped,
+        so one bad frame can't kill the client's thread
+        params:
+            websocket (WebSocketClientProtocol) - the open connection
+    """
+    async def read(self, websocket):
+        heartbeat = asyncio.ensure_future(self.heartbeat(websocket))
+        try:
+            while True:
+                message = await asyncio.wait_for(websocket.recv(), HEARTBEAT_TIMEOUT)
+                try:
+                    if not self.on_message(message): break
+                except Exception as error:
+                    self.debug.error('dropped bitstamp message {!r}: {!r}'.format(message, error))
+        finally:
+            heartbeat.cancel()
+
+    """
+        sends a bitstamp heartbeat every HEARTBEAT_INTERVAL seconds, a connection that
+        stays silent for HEARTBEAT_TIMEOUT seconds is dropped by read
+        params:
+            websocket (WebSocketClientProtocol) - the open connection
     """
-    def __init__(self, recent_trades):
-        self.recent_trades = recent_trades
-        self.logger = logging.getLogger('trades')
-        self.client = pusherclient.Pusher(BITSTAMP_PUSHER_KEY)
-        self.client.connection.bind('pusher:connection_established', self.on_connect)
-        self.client.connect()
+    async def heartbeat(self, websocket):
+        while True:
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+            await websocket.send(json.dumps({'event': 'bts:heartbeat'}))
 
     """
-        channel subscription function for pusher
+        channel subscription function for bitstamp
         params:
             channel (string) - name of channel to subscribe to
             events (list) - list of events and callbacks formatted like so:
                 [{'event':'event_name','callback':callback_name}]
                 event_name (string) - name of the event to listen for
-                callback_name (function) - function to call when event triggered
+                callback_name (function) - function to call with the event's data when triggered
     """
     def subscribe(self, channel, events):
-        subscription = self.client.subscribe(channel)
+        callbacks = self.channels.setdefault(channel, {})
         for item in events:
-            subscription.bind(item['event'], item['callback'])
+            callbacks[item['event']] = item['callback']
+        if self.websocket != None:
+            asyncio.run_coroutine_threadsafe(self.send_subscribe(channel), self.loop)
 
+    async def send_subscribe(self, channel):
+        await self.websocket.send(json.dumps({
+            'event': 'bts:subscribe',
+            'data':  { 'channel': channel }
+        }))
+
+    """
+        called when connected to bitstamp, (re)subscribes to every registered channel.
+        diffs may have been missed while disconnected, so every order book is resynced
     """
-        callback function that is called when connected to bitstamp/pusher
+    async def on_connect(self):
+        for book in self.books.values():
+            book.resync()
+        for channel in self.channels:
+            await self.send_subscribe(channel)
+
+    """
+        dispatches a message from bitstamp to the callback registered for its channel and event,
+        routing is a dict lookup on the channel name so it stays O(1) however many pairs are watched
         params:
-            data (json string) [unused] - contains socket id of connection
+            message (json string) - frame received from bitstamp
+        return:
+            (bool) - False when bitstamp has asked the client to reconnect
     """
-    def on_connect(self, data):
-        self.subscribe('live_trades_xrpusd', [
-            { 'event': 'trade',
-              'callback': self.on_trade }
-        ])
+    def on_message(self, message):
+        event, channel, data = self.decoder.frame(message)
+        if event == 'bts:request_reconnect': return False
+
+        callback = self.channels.get(channel, {}).get(event)
+        if callback != None: callback(data)
+        return True
 
     """
-        callback function that is called when a trade event is fired
-        sets the current price, as well as storing trades and calculating the trade volume
+        callback function that is called when a trade event is fired,
+        journals the trade and stores it in its pair's RecentTrades
         params:
-            data (json string) - contains information on the trade that was executed,
-                bitstamp's api docs can be found here: https://www.bitstamp.net/websocket/
-    """
-    #TODO: update comments here
-    def on_trade(self, data):
-        self.logger.info(data)
-        cur_trade = json.loads(data)
-        self.recent_trades.store_trade(cur_trade)
+            pair (string) - currency pair the trade was made on
+            data (object) - contains information on the trade that was executed, in whatever
+                form self.decoder left it, bitstamp's api docs can be found here:
+                https://www.bitstamp.net/websocket/v2/
+    """
+    def on_trade(self, pair, data):
+        trade = self.decoder.trade(data)
+        if self.journal != None: self.journal.append(pair, trade)
+        self.markets[pair].store_trade(trade)
+
+    """
+        callback function that is called when an order book diff is fired,
+        applies it to its pair's OrderBook and starts a snapshot fetch if the book is out of sync
+        params:
+            pair (string) - currency pair the diff is for
+            data (object) - contains the changed bid and ask levels, as left by self.decoder
+    """
+    def on_order_book(self, pair, data):
+        book = self.books[pair]
+        book.apply_diff(self.decoder.payload(data))
+        if book.needs_snapshot() and pair not in self.fetching:
+            self.fetching.add(pair)
+            asyncio.ensure_future(self.load_snapshot(pair))
+
+    """
+        fetches an order book snapshot in the loop's executor so the rest request
+        doesn't stall the websocket, then loads it on the loop thread. a failed fetch
+        is retried on the next diff
+        params:
+            pair (string) - currency pair of the book to resync
+    """
+    async def load_snapshot(self, pair):
+        book = self.books[pair]
+        try:
+            snapshot = await self.loop.run_in_executor(None, book.fetcher, pair)
+            book.load_snapshot(snapshot)
+        except Exception as error:
+            self.debug.error('order book snapshot for {} failed: {}'.format(pair, error))
+        finally:
+            self.fetching.discard(pair)
@@ -0,0 +1,53 @@
+"""
+    Filename: clock.py
+    Author: Jim Craveiro <jim.craveiro@gmail.com>
+    Date: 10/17/2026
+
+    clock classes used so the bot's notion of time can be swapped out for replays and tests
+"""
+
+import time
+
+"""
+    class used as the default clock, reads the system clock.
+    every clock has:
+        time() - unix time, for comparing against exchange timestamps
+        monotonic() - seconds from an arbitrary point that never go backwards, for intervals
+        sleep(seconds) - waits, or for a simulated clock moves time forward
+"""
+class WallClock():
+
+    def time(self):
+        return time.time()
+
+    def monotonic(self):
+        return time.monotonic()
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+"""
+    class used as a simulated clock, time only moves when it's told to, so reading
+    it costs an attribute lookup and replays can run as fast as trades can be stored
+"""
+class SimulatedClock():
+
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+    """
+        moves the clock forward to timestamp, never backwards
+        params:
+            timestamp (float) - unix time
+    """
+    def advance(self, timestamp):
+        if timestamp > self.now: self.now = timestamp
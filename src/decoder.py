@@ -0,0 +1,110 @@
+"""
+    Filename: decoder.py
+    Author: Jim Craveiro <jim.craveiro@gmail.com>
+    Date: 10/17/2026
+
+    Decoder classes used to parse bitstamp websocket frames, using the fastest json library installed
+"""
+
+import json
+from src.trade import Trade, BUY
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+"""
+    class used to decode frames with the standard library json module.
+    every decoder splits a frame into (event, channel, data) and leaves data in whatever
+    form is cheapest for it; callbacks turn data into a Trade with trade() or into plain
+    python objects with payload()
+"""
+class JsonDecoder():
+    name = 'json'
+
+    def frame(self, message):
+        frame = json.loads(message)
+        return frame.get('event'), frame.get('channel'), frame.get('data')
+
+    def trade(self, data):
+        return Trade.from_bitstamp(data)
+
+    def payload(self, data):
+        return data
+
+"""
+    class used to decode frames with orjson
+"""
+class OrjsonDecoder(JsonDecoder):
+    name = 'orjson'
+
+    def frame(self, message):
+        frame = orjson.loads(message)
+        return frame.get('event'), frame.get('channel'), frame.get('data')
+
+if msgspec != None:
+    class TradeData(msgspec.Struct):
+        price:          float
+        amount:         float
+        id:             int = 0
+        type:           int = BUY
+        timestamp:      str = '0'
+        microtimestamp: str = ''
+
+    class Frame(msgspec.Struct):
+        event:   str
+        channel: str = ''
+        data:    msgspec.Raw = msgspec.Raw(b'null')
+
+"""
+    class used to decode frames with msgspec. the frame's data is left as raw json bytes
+    so trade events can be decoded straight into a typed struct without building a dict
+"""
+class MsgspecDecoder(JsonDecoder):
+    name = 'msgspec'
+
+    def __init__(self):
+        self.frames = msgspec.json.Decoder(Frame)
+        self.trades = msgspec.json.Decoder(TradeData)
+
+    def frame(self, message):
+        frame = self.frames.decode(message)
+        return frame.event, frame.channel, frame.data
+
+    def trade(self, data):
+        trade = self.trades.decode(data)
+        if trade.microtimestamp:
+            timestamp = int(trade.microtimestamp) / 1e6
+        else:
+            timestamp = float(trade.timestamp)
+        return Trade(timestamp, trade.price, trade.amount, trade.type, trade.id)
+
+    def payload(self, data):
+        return msgspec.json.decode(data)
+
+DECODERS = {
+    'msgspec': (MsgspecDecoder, msgspec),
+    'orjson':  (OrjsonDecoder,  orjson),
+    'json':    (JsonDecoder,    json)
+}
+
+"""
+    function that creates a decoder, preferring msgspec, then orjson, then the standard library
+    params:
+        name (string) - name of the decoder to use, defaults to the fastest one installed
+    return:
+        (JsonDecoder) - the decoder
+"""
+def get_decoder(name=None):
+    if name != None:
+        decoder, module = DECODERS[name]
+        if module == None: raise ImportError('{} is not installed'.format(name))
+        return decoder()
+    for decoder, module in DECODERS.values():
+        if module != None: return decoder()
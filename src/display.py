@@ -0,0 +1,129 @@
+"""
+    Filename: display.py
+    Author: Jim Craveiro <jim.craveiro@gmail.com>
+    Date: 10/17/2026
+
+    Display class used to draw the curses screen, writing only what changed since the last frame
+"""
+
+import curses
+
+SCROLL_KEYS = {
+    curses.KEY_UP:    -1,
+    ord('k'):         -1,
+    curses.KEY_DOWN:   1,
+    ord('j'):          1
+}
+
+"""
+    class used to draw a pinned header line followed by a scrollable body.
+    each frame is described line by line with line(); a line whose format and values
+    are the same as last frame isn't formatted again, and a screen row is only written
+    when its text differs from what is already on screen, so an unchanged frame costs
+    no curses output at all
+"""
+class Display():
+
+    def __init__(self, stdscr):
+        self.stdscr = stdscr
+        self.header = ''
+        self.keys   = []
+        self.lines  = []
+        self.count  = 0
+        self.offset = 0
+        self.screen = {}
+
+    """
+        starts a frame
+        params:
+            fmt (string) - format string of the pinned header line
+            values (tuple) - values for fmt
+    """
+    def begin(self, fmt, *values):
+        self.header = fmt.format(*values)
+        self.count  = 0
+
+    """
+        adds the next body line of the frame
+        params:
+            indent (int) - columns to indent the line by
+            fmt (string) - format string of the line
+            values (tuple) - values for fmt
+    """
+    def line(self, indent=0, fmt='', *values):
+        key = (indent, fmt, values)
+        if self.count < len(self.keys):
+            if self.keys[self.count] != key:
+                self.keys[self.count]  = key
+                self.lines[self.count] = ' ' * indent + fmt.format(*values)
+        else:
+            self.keys.append(key)
+            self.lines.append(' ' * indent + fmt.format(*values))
+        self.count += 1
+
+    """
+        ends a frame, drops lines that weren't drawn this frame and writes the changed rows
+    """
+    def end(self):
+        del self.keys[self.count:]
+        del self.lines[self.count:]
+        self.render()
+
+    def body_rows(self):
+        rows, cols = self.stdscr.getmaxyx()
+        return max(rows - 2, 1)
+
+    """
+        scrolls the body, clamped so the last line can't scroll above the bottom of the screen
+        params:
+            lines (int) - lines to scroll down, negative scrolls up
+    """
+    def scroll(self, lines):
+        self.offset = max(0, min(self.offset + lines, len(self.lines) - self.body_rows()))
+
+    """
+        handles a key press from stdscr.getch()
+        params:
+            key (int) - the key
+        return:
+            (bool) - True if the key changed what is on screen
+    """
+    def handle_key(self, key):
+        page = self.body_rows()
+        if key == curses.KEY_RESIZE:
+            self.screen = {}
+            self.stdscr.clear()
+        elif key in SCROLL_KEYS:      self.scroll(SCROLL_KEYS[key])
+        elif key == curses.KEY_NPAGE: self.scroll(page)
+        elif key == curses.KEY_PPAGE: self.scroll(-page)
+        elif key == curses.KEY_HOME:  self.scroll(-len(self.lines))
+        elif key == curses.KEY_END:   self.scroll(len(self.lines))
+        else: return False
+        return True
+
+    def render(self):
+        rows, cols = self.stdscr.getmaxyx()
+        body = self.body_rows()
+        self.scroll(0)
+
+        frame = {0: self.header}
+        for row in range(body):
+            index = self.offset + row
+            frame[row + 2] = self.lines[index] if index < len(self.lines) else ''
+        if len(self.lines) > body and rows > 2:
+            last = min(self.offset + body, len(self.lines))
+            frame[1] = 'lines {}-{} of {}, scroll with arrows/j/k/PgUp/PgDn'.format(
+                self.offset + 1, last, len(self.lines))
+        else:
+            frame[1] = ''
+
+        changed = False
+        for row, text in frame.items():
+            if row >= rows: continue
+            text = text[:cols - 1]
+            if self.screen.get(row) == text: continue
+            self.stdscr.addstr(row, 0, text)
+            self.stdscr.clrtoeol()
+            self.screen[row] = text
+            changed = True
+        if changed: self.stdscr.refresh()
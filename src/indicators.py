@@ -0,0 +1,283 @@
+"""
+    Filename: indicators.py
+    Author: Jim Craveiro <jim.craveiro@gmail.com>
+    Date: 10/17/2026
+
+    streaming technical indicators, updated in O(1) per trade (or per candle close)
+    and registered on RecentTrades trackers with add_indicator
+"""
+
+import math
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# a weight smaller than this relative to 1 is lost to float64 rounding, so an exponential
+# average's inputs older than the point where its decay passes this can't change its value
+EPSILON = 1e-17
+
+"""
+    function that runs an exponential average recurrence, s = s + alpha * (x - s), over a
+    batch of values in one vectorized pass. only the newest values whose weight is still
+    above EPSILON are read, every older one rounds away, so the result matches the loop
+    params:
+        alpha (float) - smoothing factor, 0 < alpha <= 1
+        state (float) - average before the batch
+        values (numpy.ndarray) - values to fold in, oldest first
+    return:
+        (float) - average after the batch
+"""
+def decay(alpha, state, values):
+    count = len(values)
+    if count == 0: return state
+    keep = 1.0 - alpha
+    if keep <= 0.0: return float(values[-1])
+    tail    = min(count, int(math.log(EPSILON) / math.log(keep)) + 1)
+    weights = alpha * keep ** numpy.arange(tail - 1, -1, -1, dtype=numpy.float64)
+    return keep ** count * state + float(weights.dot(values[-tail:]))
+
+"""
+    class used as the base of every indicator. an indicator is fed every trade that enters
+    its tracker's window with update(); windowed indicators (windowed = True) are also fed
+    every trade that leaves it with expire(), so they cover exactly the tracker's window
+    without ever rescanning it. the batch methods take numpy arrays when numpy is installed
+    (array('d')s otherwise) and are used by store_trades and for backfills; the defaults loop,
+    indicators override them with a vectorized version where one exists
+"""
+class Indicator():
+
+    windowed = False
+
+    def update(self, price, amount):
+        raise NotImplementedError
+
+    def expire(self, price, amount):
+        pass
+
+    def update_batch(self, prices, amounts):
+        for price, amount in zip(prices, amounts):
+            self.update(float(price), float(amount))
+
+    def expire_batch(self, prices, amounts):
+        if not self.windowed: return
+        for price, amount in zip(prices, amounts):
+            self.expire(float(price), float(amount))
+
+    """
+        return:
+            (float or tuple) - current value, None until there is enough data
+    """
+    def value(self):
+        raise NotImplementedError
+
+"""
+    class used as an exponential moving average of price, alpha = 2 / (period + 1),
+    seeded with the first price
+"""
+class EMA(Indicator):
+
+    def __init__(self, period):
+        self.alpha = 2.0 / (period + 1)
+        self.ema   = None
+
+    def update(self, price, amount=0.0):
+        if self.ema == None: self.ema = price
+        else: self.ema += self.alpha * (price - self.ema)
+
+    def update_batch(self, prices, amounts):
+        if numpy == None: return Indicator.update_batch(self, prices, amounts)
+        if not len(prices): return
+        if self.ema == None:
+            self.ema = float(prices[0])
+            prices   = prices[1:]
+        self.ema = decay(self.alpha, self.ema, prices)
+
+    def value(self):
+        return self.ema
+
+"""
+    class used as the volume weighted average price of the tracker's window
+"""
+class VWAP(Indicator):
+
+    windowed = True
+
+    def __init__(self):
+        self.volume       = 0.0
+        self.price_volume = 0.0
+        self.count        = 0
+
+    def update(self, price, amount):
+        self.volume       += amount
+        self.price_volume += price * amount
+        self.count        += 1
+
+    def expire(self, price, amount):
+        self.volume       -= amount
+        self.price_volume -= price * amount
+        self.count        -= 1
+        if self.count == 0: self.volume = self.price_volume = 0.0
+
+    def update_batch(self, prices, amounts):
+        if numpy == None: return Indicator.update_batch(self, prices, amounts)
+        self.volume       += float(amounts.sum())
+        self.price_volume += float(prices.dot(amounts))
+        self.count        += len(prices)
+
+    def expire_batch(self, prices, amounts):
+        if numpy == None: return Indicator.expire_batch(self, prices, amounts)
+        self.volume       -= float(amounts.sum())
+        self.price_volume -= float(prices.dot(amounts))
+        self.count        -= len(prices)
+        if self.count == 0: self.volume = self.price_volume = 0.0
+
+    def value(self):
+        return self.price_volume / self.volume if self.volume > 0.0 else None
+
+"""
+    class used as the population standard deviation of price over the tracker's window.
+    sums are of price minus a shift (the first price seen in an empty window), which keeps
+    the sum of squares from cancelling catastrophically when prices are large and close together
+"""
+class RollingStd(Indicator):
+
+    windowed = True
+
+    def __init__(self):
+        self.shift   = 0.0
+        self.count   = 0
+        self.sum     = 0.0
+        self.squares = 0.0
+
+    def update(self, price, amount=0.0):
+        if self.count == 0: self.shift = price
+        delta = price - self.shift
+        self.count   += 1
+        self.sum     += delta
+        self.squares += delta * delta
+
+    def expire(self, price, amount=0.0):
+        delta = price - self.shift
+        self.count   -= 1
+        self.sum     -= delta
+        self.squares -= delta * delta
+        if self.count == 0: self.sum = self.squares = 0.0
+
+    def update_batch(self, prices, amounts):
+        if numpy == None: return Indicator.update_batch(self, prices, amounts)
+        if not len(prices): return
+        if self.count == 0: self.shift = float(prices[0])
+        deltas = prices - self.shift
+        self.count   += len(prices)
+        self.sum     += float(deltas.sum())
+        self.squares += float(deltas.dot(deltas))
+
+    def expire_batch(self, prices, amounts):
+        if numpy == None: return Indicator.expire_batch(self, prices, amounts)
+        deltas = prices - self.shift
+        self.count   -= len(prices)
+        self.sum     -= float(deltas.sum())
+        self.squares -= float(deltas.dot(deltas))
+        if self.count == 0: self.sum = self.squares = 0.0
+
+    def mean(self):
+        return self.shift + self.sum / self.count
+
+    def std(self):
+        mean = self.sum / self.count
+        return math.sqrt(max(self.squares / self.count - mean * mean, 0.0))
+
+    def value(self):
+        return self.std() if self.count > 0 else None
+
+"""
+    class used as bollinger bands over the tracker's window: the mean price plus and minus
+    width standard deviations
+"""
+class Bollinger(RollingStd):
+
+    def __init__(self, width=2.0):
+        RollingStd.__init__(self)
+        self.width = width
+
+    """
+        return:
+            (tuple) - (lower band, mean, upper band), None while the window is empty
+    """
+    def value(self):
+        if self.count == 0: return None
+        mean, band = self.mean(), self.width * self.std()
+        return (mean - band, mean, mean + band)
+
+"""
+    class used as wilder's relative strength index of price changes: the first period
+    gains and losses are averaged, after that each is smoothed with alpha = 1 / period
+"""
+class RSI(Indicator):
+
+    def __init__(self, period=14):
+        self.period  = period
+        self.alpha   = 1.0 / period
+        self.last    = None
+        self.changes = 0
+        self.gain    = 0.0
+        self.loss    = 0.0
+
+    def update(self, price, amount=0.0):
+        last, self.last = self.last, price
+        if last == None: return
+        change = price - last
+        gain, loss = max(change, 0.0), max(-change, 0.0)
+        self.changes += 1
+        if self.changes <= self.period:
+            self.gain += gain / self.period
+            self.loss += loss / self.period
+        else:
+            self.gain += self.alpha * (gain - self.gain)
+            self.loss += self.alpha * (loss - self.loss)
+
+    def update_batch(self, prices, amounts):
+        if numpy == None: return Indicator.update_batch(self, prices, amounts)
+        # the seeding averages aren't a recurrence, loop through them
+        seed = 0 if self.last == None else 1
+        seed = min(len(prices), max(self.period - self.changes + 1 - seed, 0))
+        for price in prices[:seed]:
+            self.update(float(price))
+        if seed == len(prices): return
+        changes = numpy.diff(prices[seed - 1:] if seed else numpy.concatenate(([self.last], prices)))
+        self.gain = decay(self.alpha, self.gain, numpy.maximum(changes, 0.0))
+        self.loss = decay(self.alpha, self.loss, numpy.maximum(-changes, 0.0))
+        self.changes += len(changes)
+        self.last     = float(prices[-1])
+
+    def value(self):
+        if self.changes < self.period: return None
+        if self.loss == 0.0: return 100.0 if self.gain > 0.0 else 50.0
+        return 100.0 - 100.0 / (1.0 + self.gain / self.loss)
+
+"""
+    class used as the moving average convergence divergence of price. the signal line is an
+    average of every macd value, so a batch can't skip ahead and the batch path loops
+"""
+class MACD(Indicator):
+
+    def __init__(self, fast=12, slow=26, signal=9):
+        self.fast   = EMA(fast)
+        self.slow   = EMA(slow)
+        self.signal = EMA(signal)
+
+    def update(self, price, amount=0.0):
+        self.fast.update(price)
+        self.slow.update(price)
+        self.signal.update(self.fast.ema - self.slow.ema)
+
+    """
+        return:
+            (tuple) - (macd, signal, histogram), None before the first price
+    """
+    def value(self):
+        if self.signal.ema == None: return None
+        macd = self.fast.ema - self.slow.ema
+        return (macd, self.signal.ema, macd - self.signal.ema)
@@ -0,0 +1,249 @@
+"""
+    Filename: journal.py
+    Author: Jim Craveiro <jim.craveiro@gmail.com>
+    Date: 10/17/2026
+
+    Journal class used to persist trades as fixed width binary records, one file per pair per day
+"""
+
+import os
+import mmap
+import time
+import queue
+import struct
+import threading
+from src.trade import Trade
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# timestamp, id, price, amount, side, padded to 40 bytes so records stay 8 byte aligned
+RECORD         = struct.Struct('<dQddb7x')
+TIMESTAMP      = struct.Struct('<d')
+DAY            = 86400
+BUFFER_SIZE    = 64 * 1024
+FLUSH_INTERVAL = 1.0
+EXTENSION      = '.trades'
+
+if numpy != None:
+    RECORD_DTYPE = numpy.dtype([('timestamp', '<f8'), ('id', '<u8'), ('price', '<f8'),
+                                ('amount', '<f8'), ('side', 'i1'), ('pad', 'V7')])
+
+"""
+    function that builds the path of a pair's journal file for a day
+    params:
+        path (string) - journal directory
+        pair (string) - bitstamp currency pair
+        day (int) - days since the unix epoch, utc
+    return:
+        (string) - e.g. 'log/journal/xrpusd/20180107.trades'
+"""
+def journal_file(path, pair, day):
+    return os.path.join(path, pair, time.strftime('%Y%m%d', time.gmtime(day * DAY)) + EXTENSION)
+
+"""
+    function that lists a pair's journal files, oldest first
+    params:
+        path (string) - journal directory
+        pair (string) - bitstamp currency pair
+    return:
+        (list) - file paths
+"""
+def journal_files(path, pair):
+    directory = os.path.join(path, pair)
+    if not os.path.isdir(directory): return []
+    return [os.path.join(directory, name) for name in sorted(os.listdir(directory)) if name.endswith(EXTENSION)]
+
+"""
+    function that reads a pair's trades newer than a point in time without scanning
+    the whole journal: only the files for days that can hold such trades are opened,
+    and the first matching record in each is found by binary search
+    params:
+        path (string) - journal directory
+        pair (string) - bitstamp currency pair
+        since (float) - unix time, only trades after it are returned
+    return:
+        (list) - Trades, oldest first
+"""
+def read_since(path, pair, since):
+    first_file = journal_file(path, pair, int(since // DAY))
+    trades = []
+    for filename in journal_files(path, pair):
+        if filename < first_file: continue
+        with JournalReader(filename) as reader:
+            low, high = 0, len(reader)
+            while low < high:
+                middle = (low + high) // 2
+                if reader.timestamp(middle) <= since: low = middle + 1
+                else: high = middle
+            trades.extend(reader.trades(low))
+    return trades
+
+"""
+    class used to append trades to the journal. append packs the trade into a per-file
+    buffer under a lock and returns; full buffers are handed to a writer thread so the disk
+    is never touched on the websocket thread. the writer also writes out every buffer
+    started more than flush_interval ago, after each write and whenever it has waited until
+    the oldest buffer's deadline, so a quiet pair's trades reach disk however busy the rest are
+"""
+class Journal():
+
+    """
+        params:
+            path (string) - journal directory
+            buffer_size (int) - bytes buffered per file before they're written, defaults to BUFFER_SIZE
+            flush_interval (float) - longest time in seconds a trade waits to be written,
+                defaults to FLUSH_INTERVAL
+    """
+    def __init__(self, path, buffer_size=BUFFER_SIZE, flush_interval=FLUSH_INTERVAL):
+        self.path           = path
+        self.buffer_size    = buffer_size
+        self.flush_interval = flush_interval
+        self.buffers        = {}
+        self.lock           = threading.Lock()
+        self.queue          = queue.SimpleQueue()
+        self.thread         = threading.Thread(target=self.run)
+        self.thread.daemon  = True
+        self.thread.start()
+
+    """
+        params:
+            pair (string) - currency pair the trade was made on
+            trade (Trade) - the trade to record
+    """
+    def append(self, pair, trade):
+        key = (pair, int(trade.timestamp // DAY))
+        with self.lock:
+            entry = self.buffers.get(key)
+            # buffers are (time started, bytes), self.buffers stays in the order they were started
+            if entry == None: entry = self.buffers[key] = (time.monotonic(), bytearray())
+            buffer = entry[1]
+            buffer += RECORD.pack(trade.timestamp, trade.id, trade.price, trade.amount, trade.side)
+            if len(buffer) >= self.buffer_size:
+                self.queue.put((key, bytes(buffer)))
+                del self.buffers[key]
+
+    """
+        hands every buffered trade to the writer thread
+    """
+    def flush(self):
+        with self.lock:
+            buffers, self.buffers = self.buffers, {}
+        for key, (started, buffer) in buffers.items():
+            self.queue.put((key, bytes(buffer)))
+
+    """
+        takes the buffers started more than flush_interval ago out of self.buffers
+        return:
+            (tuple) - ((key, data) for every stale buffer, seconds until the next buffer goes stale)
+    """
+    def take_stale(self):
+        stale = []
+        now   = time.monotonic()
+        with self.lock:
+            for key, (started, buffer) in list(self.buffers.items()):
+                if started + self.flush_interval > now:
+                    return stale, started + self.flush_interval - now
+                stale.append((key, bytes(buffer)))
+                del self.buffers[key]
+        return stale, self.flush_interval
+
+    """
+        writer thread, keeps the newest file of each pair open and closes it once
+        trades for the next day arrive, so files rotate daily
+    """
+    def run(self):
+        files   = {}
+        timeout = self.flush_interval
+        while True:
+            try:
+                item = self.queue.get(timeout=timeout)
+                if item == None: break
+                self.write(files, *item)
+            except queue.Empty:
+                pass
+            stale, timeout = self.take_stale()
+            for key, data in stale:
+                self.write(files, key, data)
+
+        for file in files.values():
+            file.close()
+
+    def write(self, files, key, data):
+        pair, day = key
+        filename = journal_file(self.path, pair, day)
+        file = files.get(pair)
+        if file == None or file.name != filename:
+            if file != None: file.close()
+            os.makedirs(os.path.dirname(filename), exist_ok=True)
+            file = files[pair] = open(filename, 'ab')
+        file.write(data)
+        file.flush()
+
+    """
+        writes everything still buffered and stops the writer thread
+    """
+    def close(self):
+        self.flush()
+        self.queue.put(None)
+        self.thread.join()
+
+"""
+    class used to read a journal file through mmap. records are fixed width, so
+    the file is scanned in place with no copying or parsing beyond struct unpacking,
+    any record can be found by offset, and a partly written trailing record is ignored
+"""
+class JournalReader():
+
+    def __init__(self, filename):
+        self.file = open(filename, 'rb')
+        size = os.fstat(self.file.fileno()).st_size
+        self.length = size // RECORD.size
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+
+    def __len__(self):
+        return self.length
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        if self.map != None: self.map.close()
+        self.file.close()
+
+    """
+        unpacks one record
+        params:
+            index (int) - record number
+        return:
+            (tuple) - (timestamp, id, price, amount, side)
+    """
+    def record(self, index):
+        return RECORD.unpack_from(self.map, index * RECORD.size)
+
+    def timestamp(self, index):
+        return TIMESTAMP.unpack_from(self.map, index * RECORD.size)[0]
+
+    """
+        iterates over the trades in the file, starting at a record number
+        params:
+            start (int) - first record to read, defaults to 0
+    """
+    def trades(self, start=0):
+        unpack = RECORD.unpack_from
+        for offset in range(start * RECORD.size, self.length * RECORD.size, RECORD.size):
+            timestamp, id, price, amount, side = unpack(self.map, offset)
+            yield Trade(timestamp, price, amount, side, id)
+
+    """
+        zero-copy structured numpy array over the file, requires numpy.
+        the array keeps the mmap alive, so the reader must not be closed while it's used
+    """
+    def array(self):
+        return numpy.frombuffer(self.map, dtype=RECORD_DTYPE, count=self.length) if self.length else \
+               numpy.zeros(0, dtype=RECORD_DTYPE)
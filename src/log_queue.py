@@ -0,0 +1,88 @@
+"""
+    Filename: log_queue.py
+    Author: Jim Craveiro <jim.craveiro@gmail.com>
+    Date: 10/17/2026
+
+    QueueWriter class used to move log writes off of the threads doing the logging
+"""
+
+import time
+import queue
+import logging
+import threading
+import logging.handlers
+
+BATCH_SIZE     = 512
+FLUSH_INTERVAL = 1.0
+
+# put on the queue to tell the writer thread to flush and exit
+STOP = object()
+
+"""
+    file handler that writes records without flushing them,
+    the QueueWriter that owns it decides when to flush
+"""
+class BatchingFileHandler(logging.FileHandler):
+
+    def emit(self, record):
+        try:
+            if self.stream == None: self.stream = self._open()
+            self.stream.write(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+
+"""
+    class used to write log records from a background thread. loggers get a
+    QueueHandler, which only puts the record on an unbounded queue, so logging
+    never waits on the disk; the writer thread drains the queue into its handler
+    and flushes once batch_size records are pending or flush_interval seconds pass
+"""
+class QueueWriter():
+
+    """
+        params:
+            handler (logging.Handler) - handler that does the actual writing
+            batch_size (int) - pending records that trigger a flush, defaults to BATCH_SIZE
+            flush_interval (float) - longest time in seconds a record waits to be flushed,
+                defaults to FLUSH_INTERVAL
+    """
+    def __init__(self, handler, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL):
+        self.target         = handler
+        self.batch_size     = batch_size
+        self.flush_interval = flush_interval
+        self.queue          = queue.SimpleQueue()
+        self.thread         = threading.Thread(target=self.run)
+        self.thread.daemon  = True
+        self.thread.start()
+
+    def handler(self):
+        return logging.handlers.QueueHandler(self.queue)
+
+    def run(self):
+        pending    = 0
+        last_flush = time.monotonic()
+        while True:
+            timeout = None
+            if pending: timeout = max(self.flush_interval - (time.monotonic() - last_flush), 0)
+            try:
+                record = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                record = None
+            if record is STOP: break
+
+            if record != None:
+                self.target.handle(record)
+                pending += 1
+            now = time.monotonic()
+            if pending >= self.batch_size or (pending and now - last_flush >= self.flush_interval):
+                self.target.flush()
+                pending    = 0
+                last_flush = now
+        self.target.flush()
+
+    """
+        flushes whatever is still queued and stops the writer thread
+    """
+    def stop(self):
+        self.queue.put(STOP)
+        self.thread.join()
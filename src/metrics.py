@@ -0,0 +1,181 @@
+"""
+    Filename: metrics.py
+    Author: Jim Craveiro <jim.craveiro@gmail.com>
+    Date: 10/17/2026
+
+    MetricsServer class used to serve the bot's current prices and tracker values over http
+    when it runs headless, in prometheus' text format and as json
+"""
+
+import json
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRICS_HOST      = '127.0.0.1'
+METRICS_PORT      = 9109
+PROMETHEUS_TYPE   = 'text/plain; version=0.0.4; charset=utf-8'
+JSON_TYPE         = 'application/json'
+UPTIME_PROMETHEUS = ('# HELP bitstamp_uptime_seconds Seconds since the bot started\n'
+                     '# TYPE bitstamp_uptime_seconds gauge\n'
+                     'bitstamp_uptime_seconds {}\n')
+# (metric name, help text, TrackerSnapshot field)
+TRACKER_METRICS   = [
+    ('bitstamp_tracker_volume',        'Traded volume in the window, in the base currency', 'volume'),
+    ('bitstamp_tracker_price_volume',  'Traded volume in the window, in the quote currency', 'price_volume'),
+    ('bitstamp_tracker_average_price', 'Mean trade price in the window', 'average_price'),
+    ('bitstamp_tracker_trades',        'Number of trades in the window', 'count'),
+    ('bitstamp_tracker_vwap',          'Volume weighted average price in the window', 'vwap'),
+    ('bitstamp_tracker_buy_volume',    'Bought volume in the window, in the base currency', 'buy_volume'),
+    ('bitstamp_tracker_sell_volume',   'Sold volume in the window, in the base currency', 'sell_volume'),
+    ('bitstamp_tracker_buys',          'Number of buys in the window', 'buy_count'),
+    ('bitstamp_tracker_sells',         'Number of sells in the window', 'sell_count'),
+    ('bitstamp_tracker_imbalance',     'Buys minus sells over trades in the window, -1 to 1', 'imbalance')
+]
+
+"""
+    function that formats a value as a prometheus sample value
+    params:
+        value (float) - the value, or a string holding one, None before there is one
+    return:
+        (string) - the value, or NaN for None
+"""
+def sample(value):
+    return 'NaN' if value == None else repr(float(value))
+
+"""
+    function that reads a snapshot's last price
+    params:
+        snapshot (Snapshot) - RecentTrades snapshot
+    return:
+        (float) - price of the last trade, None before the pair's first trade
+"""
+def last_price(snapshot):
+    price = float(snapshot.price)
+    return price if snapshot.version > 0 and price != 0.0 else None
+
+"""
+    function that escapes a prometheus label value
+    params:
+        value (string) - label value
+    return:
+        (string) - value with backslashes, quotes and newlines escaped
+"""
+def label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+"""
+    function that renders the markets in prometheus' text exposition format
+    params:
+        snapshots (dict) - RecentTrades Snapshots keyed by currency pair
+    return:
+        (bytes) - utf-8 encoded metrics
+"""
+def render_prometheus(snapshots):
+    lines = [
+        '# HELP bitstamp_price Price of the last trade',
+        '# TYPE bitstamp_price gauge'
+    ]
+    for pair, snapshot in snapshots.items():
+        lines.append('bitstamp_price{{pair="{}"}} {}'.format(label(pair), sample(last_price(snapshot))))
+    for name, text, field in TRACKER_METRICS:
+        lines.append('# HELP {} {}'.format(name, text))
+        lines.append('# TYPE {} gauge'.format(name))
+        for pair, snapshot in snapshots.items():
+            for tracker_name, tracker in snapshot.trackers.items():
+                lines.append('{}{{pair="{}",tracker="{}"}} {}'.format(
+                    name, label(pair), label(tracker_name), sample(getattr(tracker, field))
+                ))
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+"""
+    function that renders the markets as json
+    params:
+        snapshots (dict) - RecentTrades Snapshots keyed by currency pair
+    return:
+        (bytes) - utf-8 encoded json object
+"""
+def render_json(snapshots):
+    return json.dumps({pair: {
+        'price':    last_price(snapshot),
+        'trackers': {name: tracker._asdict() for name, tracker in snapshot.trackers.items()}
+    } for pair, snapshot in snapshots.items()}).encode('utf-8')
+
+"""
+    class used to answer scrapes with whatever bodies the server last published.
+    it never touches a RecentTrades, so a scrape costs a dict lookup and a socket write
+"""
+class MetricsHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        path = self.path.split('?', 1)[0]
+        response = self.server.metrics.bodies.get(path)
+        if response == None:
+            self.send_error(404)
+            return
+        content_type, body = response
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logging.getLogger('debug').debug('metrics: ' + format % args)
+
+"""
+    class used to serve the markets over http on a daemon thread. responses are serialized
+    once per publish() on the publishing thread and swapped in as a whole, so handler
+    threads only ever read a finished dict of bytes and never contend with ingestion.
+    serves:
+        /metrics - prometheus text format
+        /metrics.json - json
+"""
+class MetricsServer():
+
+    """
+        params:
+            markets (dict) - RecentTrades keyed by currency pair
+            host (string) - address to bind, defaults to METRICS_HOST
+            port (int) - port to bind, defaults to METRICS_PORT
+    """
+    def __init__(self, markets, host=METRICS_HOST, port=METRICS_PORT):
+        self.markets    = markets
+        self.versions   = None
+        self.prometheus = b''
+        self.json       = b''
+        self.bodies     = {}
+        self.publish(0.0)
+        self.server     = ThreadingHTTPServer((host, port), MetricsHandler)
+        self.server.daemon_threads = True
+        self.server.metrics = self
+        self.thread     = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    """
+        serializes the latest snapshots. the markets are only rendered again when a
+        snapshot's version changed since the last publish, otherwise only the uptime is
+        and the cached market bytes are reused
+        params:
+            uptime (float) - seconds the bot has been running
+    """
+    def publish(self, uptime):
+        snapshots = {pair: recent_trades.snapshot() for pair, recent_trades in self.markets.items()}
+        versions  = tuple(snapshot.version for snapshot in snapshots.values())
+        if versions != self.versions:
+            self.prometheus = render_prometheus(snapshots)
+            self.json       = render_json(snapshots)
+            self.versions   = versions
+        self.bodies = {
+            '/metrics': (PROMETHEUS_TYPE, UPTIME_PROMETHEUS.format(sample(uptime)).encode('utf-8') + self.prometheus),
+            '/metrics.json': (JSON_TYPE, b''.join([
+                b'{"uptime": ', repr(float(uptime)).encode('utf-8'), b', "markets": ', self.json, b'}'
+            ]))
+        }
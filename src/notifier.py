@@ -0,0 +1,198 @@
+"""
+    Filename: notifier.py
+    Author: Jim Craveiro <jim.craveiro@gmail.com>
+    Date: 10/17/2026
+
+    Notifier class used to send Pushover notifications from a background thread
+"""
+
+import queue
+import logging
+import requests
+import threading
+from collections import OrderedDict
+from src.clock import WallClock
+
+PUSHOVER_URL        = 'https://api.pushover.net/1/messages.json'
+PUSHOVER_RETRIES    = 2
+PUSHOVER_PRIORITY   = {'silent'   :'-2',
+                       'low'      :'-1',
+                       'default'  : '0',
+                       'high'     : '1',
+                       'emergency': '2'}
+PUSHOVER_EMERGENCY_RETRY  = 120
+PUSHOVER_EMERGENCY_EXPIRE = 600
+MAX_QUEUED          = 64
+BACKOFF             = 1.0
+MAX_BACKOFF         = 30.0
+DEDUPE_WINDOW       = 60.0
+TIMEOUT             = 10
+
+# put on the queue to tell the worker thread to send what is left and exit
+STOP = object()
+
+"""
+    class used to send Pushover notifications without blocking the caller. notify() only
+    puts the notification on a bounded queue (dropping it if the queue is full), a worker
+    thread posts them over one keep-alive requests.Session and retries failures with
+    exponential backoff.
+    a notification is identified by its key, (message, title, priority) unless the caller
+    gives one: one that is already waiting on the queue is coalesced into it (and sent with
+    the newest message), and one that was sent less than dedupe_window
+    seconds ago is suppressed. the next time it is sent its message notes how many times it
+    fired, unless it then stays quiet for dedupe_window seconds after its last repeat. Pushover documentation can be found here: https://pushover.net/api
+"""
+class Notifier():
+
+    """
+        params:
+            token (string) - Pushover application token
+            user (string) - Pushover user key
+            url (string) - messages endpoint, defaults to PUSHOVER_URL
+            session (requests.Session) - session to post with, defaults to a new one
+            max_queued (int) - distinct notifications that can wait to be sent, defaults to MAX_QUEUED
+            retries (int) - retries (total attempts - 1) for a failed post, defaults to PUSHOVER_RETRIES
+            backoff (float) - seconds before the first retry, doubled for every retry after,
+                defaults to BACKOFF
+            max_backoff (float) - longest wait between retries, defaults to MAX_BACKOFF
+            dedupe_window (float) - seconds a sent notification suppresses repeats of itself,
+                defaults to DEDUPE_WINDOW
+            clock (WallClock) - clock for the dedupe window, defaults to WallClock()
+    """
+    def __init__(self, token, user, url=PUSHOVER_URL, session=None, max_queued=MAX_QUEUED,
+                 retries=PUSHOVER_RETRIES, backoff=BACKOFF, max_backoff=MAX_BACKOFF,
+                 dedupe_window=DEDUPE_WINDOW, clock=None):
+        self.token         = token
+        self.user          = user
+        self.url           = url
+        self.session       = session if session != None else requests.Session()
+        self.retries       = retries
+        self.backoff       = backoff
+        self.max_backoff   = max_backoff
+        self.dedupe_window = dedupe_window
+        self.clock         = clock if clock != None else WallClock()
+        self.queue         = queue.Queue(max_queued)
+        self.lock          = threading.Lock()
+        self.pending       = {}
+        self.sent          = OrderedDict()
+        self.suppressed    = OrderedDict()
+        self.stopping      = threading.Event()
+        self.thread        = threading.Thread(target=self.run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    """
+        queues a notification, never blocks
+        params:
+            message (string) - the push notification message body
+            title (string) - the title of the push notification,
+                             defaults to empty string which lets Pushover use its default
+            priority (string) - key of PUSHOVER_PRIORITY, defaults to 'default', anything
+                else raises ValueError
+            key (hashable) - what repeats are recognized by, e.g. the alert rule that fired, so
+                messages that differ only in a value are still coalesced and deduped,
+                defaults to (message, title, priority)
+        return:
+            (bool) - True if the notification was queued or coalesced into a queued one,
+                     False if it was suppressed as a repeat or the queue was full
+    """
+    def notify(self, message, title='', priority='default', key=None):
+        if priority not in PUSHOVER_PRIORITY: raise ValueError('unknown priority: {}'.format(priority))
+        if key == None: key = (message, title, priority)
+        with self.lock:
+            if key in self.pending:
+                self.pending[key][0:3] = message, title, priority
+                self.pending[key][3]  += 1
+                return True
+            self.prune()
+            if key in self.sent:
+                # (repeats, time of the last one), kept in the order of their last repeat
+                count = self.suppressed.pop(key, (0, 0.0))[0]
+                self.suppressed[key] = (count + 1, self.clock.monotonic())
+                return False
+            try:
+                self.queue.put_nowait(key)
+            except queue.Full:
+                logging.getLogger('debug').error('notification queue full, dropped: {}'.format(message))
+                return False
+            self.pending[key] = [message, title, priority, 1 + self.suppressed.pop(key, (0, 0.0))[0]]
+            return True
+
+    """
+        forgets notifications sent more than dedupe_window seconds ago, and suppressed repeats
+        whose last repeat was that long ago. both are kept oldest first so only expired entries
+        are looked at. the caller holds self.lock
+    """
+    def prune(self):
+        cutoff = self.clock.monotonic() - self.dedupe_window
+        while self.sent and next(iter(self.sent.values())) <= cutoff:
+            self.sent.popitem(last=False)
+        while self.suppressed and next(iter(self.suppressed.values()))[1] <= cutoff:
+            self.suppressed.popitem(last=False)
+
+    def run(self):
+        while True:
+            key = self.queue.get()
+            if key is STOP: break
+            with self.lock:
+                message, title, priority, count = self.pending.pop(key)
+                self.sent[key] = self.clock.monotonic()
+                # moved to the end, keeping self.sent in the order notifications were sent
+                self.sent.move_to_end(key)
+            if count > 1: message = '{} (x{})'.format(message, count)
+            try:
+                self.send(message, title, priority)
+            except Exception as error:
+                logging.getLogger('debug').error('push notification failed: {!r}'.format(error))
+
+    """
+        posts a notification, retrying with exponential backoff on connection errors,
+        rate limiting and server errors; other client errors aren't retried
+        params:
+            message (string) - the push notification message body
+            title (string) - the title of the push notification
+            priority (string) - key of PUSHOVER_PRIORITY
+        return:
+            (bool) - True if Pushover accepted the notification
+    """
+    def send(self, message, title, priority):
+        payload = {
+            'token'   : self.token,
+            'user'    : self.user,
+            'message' : message,
+            'title'   : title,
+            'priority': PUSHOVER_PRIORITY[priority]
+        }
+        if priority == 'emergency':
+            payload['retry']  = PUSHOVER_EMERGENCY_RETRY
+            payload['expire'] = PUSHOVER_EMERGENCY_EXPIRE
+
+        for attempt in range(self.retries + 1):
+            try:
+                response = self.session.post(self.url, data=payload, timeout=TIMEOUT)
+                if response.status_code < 400: return True
+                error     = 'status code: {}\n    error text: {}'.format(response.status_code, response.text)
+                retryable = response.status_code == 429 or response.status_code >= 500
+            except requests.RequestException as exception:
+                error     = str(exception)
+                retryable = True
+            logging.getLogger('debug').error('push notification failed on try {}/{} with {}\n'.format(
+                attempt + 1, self.retries + 1, error
+            ))
+            if not retryable or attempt == self.retries: break
+            if self.stopping.wait(min(self.backoff * 2 ** attempt, self.max_backoff)): break
+        return False
+
+    """
+        sends what is already queued and stops the worker thread. retries are cut short,
+        so a failing endpoint can hold this up for at most one post per notification
+        params:
+            timeout (float) - longest time to wait for the worker, defaults to TIMEOUT
+    """
+    def stop(self, timeout=TIMEOUT):
+        self.stopping.set()
+        try:
+            self.queue.put(STOP, timeout=timeout)
+        except queue.Full:
+            return
+        self.thread.join(timeout)
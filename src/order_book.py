@@ -0,0 +1,255 @@
+"""
+    Filename: order_book.py
+    Author: Jim Craveiro <jim.craveiro@gmail.com>
+    Date: 10/17/2026
+
+    OrderBook class used to keep a local L2 order book from bitstamp's diff_order_book channel
+"""
+
+import bisect
+import requests
+from collections import namedtuple
+
+BITSTAMP_ORDER_BOOK_URL = 'https://www.bitstamp.net/api/v2/order_book/{}/'
+DEPTH_BPS               = [10, 50, 100]
+
+# immutable view of the top of the book, a new one is published after every applied diff
+BookSnapshot = namedtuple('BookSnapshot', ['synced', 'microtimestamp', 'bid', 'ask', 'mid', 'spread', 'depth'])
+
+"""
+    function that fetches a full order book snapshot from bitstamp's rest api
+    params:
+        pair (string) - bitstamp currency pair, e.g. 'xrpusd'
+    return:
+        (dict) - decoded order book with 'microtimestamp', 'bids' and 'asks'
+"""
+def fetch_order_book(pair):
+    response = requests.get(BITSTAMP_ORDER_BOOK_URL.format(pair), timeout=10)
+    response.raise_for_status()
+    return response.json()
+
+"""
+    class used to hold one side of the book as price levels kept sorted best first.
+    sort keys (price for asks, -price for bids) are kept in a bucketed sorted list, the
+    same layout as sortedcontainers' SortedList: a list of sorted buckets of at most
+    2 * LOAD keys, and maxes, the last key of every bucket. a level is found by bisecting
+    maxes and then its bucket, and inserting or deleting only shifts that one bucket, so
+    an update is O(log n) comparisons plus an O(LOAD) memmove however deep the book gets.
+    the best level is buckets[0][0], levels maps each price to the amount resting there
+"""
+class BookSide():
+
+    # keys per bucket before it is split in two, see sortedcontainers' DEFAULT_LOAD_FACTOR
+    LOAD = 512
+
+    def __init__(self, descending):
+        self.sign    = -1.0 if descending else 1.0
+        self.buckets = []
+        self.maxes   = []
+        self.levels  = {}
+
+    def __len__(self):
+        return len(self.levels)
+
+    """
+        sets the amount resting at a price level, removing the level when amount is 0
+        params:
+            price (float) - price of the level
+            amount (float) - new total amount at the level
+    """
+    def update(self, price, amount):
+        if amount == 0.0:
+            if self.levels.pop(price, None) != None: self.remove(self.sign * price)
+        else:
+            if price not in self.levels: self.insert(self.sign * price)
+            self.levels[price] = amount
+
+    def insert(self, key):
+        buckets, maxes = self.buckets, self.maxes
+        if not buckets:
+            buckets.append([key])
+            maxes.append(key)
+            return
+        index = bisect.bisect_left(maxes, key)
+        if index == len(maxes):
+            index -= 1
+            buckets[index].append(key)
+            maxes[index] = key
+        else:
+            bisect.insort(buckets[index], key)
+        bucket = buckets[index]
+        if len(bucket) > 2 * self.LOAD:
+            buckets.insert(index + 1, bucket[self.LOAD:])
+            maxes.insert(index + 1, bucket[-1])
+            del bucket[self.LOAD:]
+            maxes[index] = bucket[-1]
+
+    def remove(self, key):
+        buckets, maxes = self.buckets, self.maxes
+        index  = bisect.bisect_left(maxes, key)
+        bucket = buckets[index]
+        del bucket[bisect.bisect_left(bucket, key)]
+        if not bucket:
+            del buckets[index]
+            del maxes[index]
+        else:
+            maxes[index] = bucket[-1]
+
+    def best(self):
+        return self.sign * self.buckets[0][0] if self.buckets else None
+
+    """
+        total amount resting at levels priced at or better than each limit, in one walk
+        from the best level to the widest limit
+        params:
+            limits (list) - worst prices to include, nearest the best level first
+        return:
+            (list) - summed amount for each limit
+    """
+    def depths(self, limits):
+        totals = []
+        total  = 0.0
+        keys   = iter(key for bucket in self.buckets for key in bucket)
+        key    = next(keys, None)
+        for limit in limits:
+            limit_key = self.sign * limit
+            while key != None and key <= limit_key:
+                total += self.levels[self.sign * key]
+                key    = next(keys, None)
+            totals.append(total)
+        return totals
+
+    def clear(self):
+        self.buckets = []
+        self.maxes   = []
+        self.levels  = {}
+
+"""
+    class used to keep a local L2 order book for one pair by applying bitstamp's
+    diff_order_book messages incrementally. bitstamp's diffs carry no sequence number,
+    so a microtimestamp that goes backwards (or a reconnect, see Client) is treated as a gap:
+    the book is marked out of sync, diffs are buffered, a rest snapshot is loaded and the
+    buffered diffs newer than the snapshot are replayed on top of it.
+    like RecentTrades, readers only ever fetch self.latest, an immutable BookSnapshot
+"""
+class OrderBook():
+
+    """
+        params:
+            pair (string) - bitstamp currency pair, e.g. 'xrpusd'
+            fetcher (function) - called with the pair to fetch a rest snapshot,
+                defaults to fetch_order_book
+            depth_bps (list) - distances from the mid price, in basis points,
+                to publish depth for, defaults to DEPTH_BPS
+            updated (threading.Event) - set whenever a new snapshot is published,
+                defaults to None
+    """
+    def __init__(self, pair, fetcher=fetch_order_book, depth_bps=DEPTH_BPS, updated=None):
+        self.pair      = pair
+        self.updated   = updated
+        self.fetcher   = fetcher
+        self.depth_bps = depth_bps
+        self.bids      = BookSide(True)
+        self.asks      = BookSide(False)
+        self.synced    = False
+        self.pending   = []
+        self.microtimestamp = 0
+        self.latest    = BookSnapshot(False, 0, None, None, None, None, {})
+
+    def snapshot(self):
+        return self.latest
+
+    def needs_snapshot(self):
+        return not self.synced
+
+    """
+        marks the book out of sync so diffs are buffered until a snapshot is loaded
+    """
+    def resync(self):
+        self.synced  = False
+        self.pending = []
+        self.publish()
+
+    """
+        applies a diff_order_book message, or buffers it while out of sync
+        params:
+            data (dict) - decoded diff, bitstamp's api docs can be found here:
+                https://www.bitstamp.net/websocket/v2/
+    """
+    def apply_diff(self, data):
+        microtimestamp = int(data['microtimestamp'])
+        if not self.synced:
+            self.pending.append(data)
+            return
+        if microtimestamp < self.microtimestamp:
+            self.resync()
+            self.pending.append(data)
+            return
+        self.apply_levels(data)
+        self.microtimestamp = microtimestamp
+        self.publish()
+
+    def apply_levels(self, data):
+        for price, amount in data['bids']:
+            self.bids.update(float(price), float(amount))
+        for price, amount in data['asks']:
+            self.asks.update(float(price), float(amount))
+
+    """
+        replaces the book with a full snapshot and replays the diffs buffered since the resync
+        params:
+            snapshot (dict) - decoded order book as returned by fetch_order_book
+    """
+    def load_snapshot(self, snapshot):
+        self.bids.clear()
+        self.asks.clear()
+        self.apply_levels(snapshot)
+        self.microtimestamp = int(snapshot['microtimestamp'])
+        pending, self.pending = self.pending, []
+        # compared to the snapshot's time, not the last replayed diff's, so diffs sharing
+        # a microtimestamp are all replayed as they would have been applied live
+        since = self.microtimestamp
+        for data in pending:
+            if int(data['microtimestamp']) > since:
+                self.apply_levels(data)
+                self.microtimestamp = max(self.microtimestamp, int(data['microtimestamp']))
+        self.synced = True
+        self.publish()
+
+    def best_bid(self):
+        return self.bids.best()
+
+    def best_ask(self):
+        return self.asks.best()
+
+    def mid(self):
+        bid, ask = self.bids.best(), self.asks.best()
+        if bid == None or ask == None: return None
+        return (bid + ask) / 2
+
+    def spread(self):
+        bid, ask = self.bids.best(), self.asks.best()
+        if bid == None or ask == None: return None
+        return ask - bid
+
+    """
+        amount resting on each side within each distance of the mid price, each side is
+        walked once out to the widest distance
+        params:
+            bps (list) - distances from the mid price in basis points
+        return:
+            (dict) - (bid depth, ask depth) keyed by distance, both 0.0 while either side is empty
+    """
+    def depths(self, bps):
+        mid = self.mid()
+        if mid == None: return {distance: (0.0, 0.0) for distance in bps}
+        ordered = sorted(bps)
+        bids    = self.bids.depths([mid * (1 - distance / 10000.0) for distance in ordered])
+        asks    = self.asks.depths([mid * (1 + distance / 10000.0) for distance in ordered])
+        return {distance: (bid, ask) for distance, bid, ask in zip(ordered, bids, asks)}
+
+    def publish(self):
+        depth = self.depths(self.depth_bps) if self.synced else {}
+        self.latest = BookSnapshot(self.synced, self.microtimestamp, self.best_bid(), self.best_ask(),
+                                   self.mid(), self.spread(), depth)
+        if self.updated != None: self.updated.set()
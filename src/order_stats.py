@@ -0,0 +1,163 @@
+"""
+    Filename: order_stats.py
+    Author: Jim Craveiro <jim.craveiro@gmail.com>
+    Date: 10/17/2026
+
+    exact rolling order statistics (low, high, median and other quantiles) over a tracker's
+    window, as windowed indicators: a window expires trades in the order they entered it,
+    so each structure numbers the prices it is given and treats everything numbered below
+    its expired count as gone, without searching for it
+"""
+
+import math
+import heapq
+from collections import deque
+from src.indicators import Indicator
+
+# dead heap entries tolerated, beyond twice the live ones, before a heap is rebuilt without them
+SLACK = 64
+
+"""
+    class used as the lowest price in the window, a monotonic deque: each price drops every
+    newer-or-equal price above it before being appended, so the front is the minimum and
+    each price is pushed and popped at most once, O(1) amortized per trade
+"""
+class RollingMin(Indicator):
+
+    windowed = True
+    # prices are stored multiplied by sign, so RollingMax is the same deque over -price
+    sign     = 1.0
+
+    def __init__(self):
+        self.deque   = deque()
+        self.added   = 0
+        self.expired = 0
+
+    def update(self, price, amount=0.0):
+        price = self.sign * price
+        while self.deque and self.deque[-1][0] >= price:
+            self.deque.pop()
+        self.deque.append((price, self.added))
+        self.added += 1
+
+    def expire(self, price, amount=0.0):
+        if self.deque and self.deque[0][1] == self.expired:
+            self.deque.popleft()
+        self.expired += 1
+
+    def value(self):
+        return self.sign * self.deque[0][0] if self.deque else None
+
+"""
+    class used as the highest price in the window, see RollingMin
+"""
+class RollingMax(RollingMin):
+
+    sign = -1.0
+
+"""
+    class used as a quantile of price over the window by nearest rank, from two heaps: low,
+    a max heap of the ceil(q * n) smallest prices, and high, a min heap of the rest, so the
+    quantile is the top of low. entries are (price, number) pairs, unique and totally
+    ordered, so whether an expiring price sits in low or high follows from comparing it to
+    low's top. expired entries are only removed once they reach the top of a heap (lazy
+    deletion) or when dead entries outnumber live ones and a heap is rebuilt, keeping both
+    insertion and expiry O(log n) amortized
+"""
+class RollingQuantile(Indicator):
+
+    windowed = True
+
+    """
+        params:
+            q (float) - quantile, 0 < q <= 1
+    """
+    def __init__(self, q):
+        if not 0.0 < q <= 1.0: raise ValueError('quantile must be in (0, 1], got {}'.format(q))
+        self.q         = q
+        self.low       = []
+        self.high      = []
+        self.low_size  = 0
+        self.high_size = 0
+        self.added     = 0
+        self.expired   = 0
+
+    def update(self, price, amount=0.0):
+        self.prune()
+        entry = (price, self.added)
+        self.added += 1
+        if self.low and entry <= (-self.low[0][0], -self.low[0][1]):
+            heapq.heappush(self.low, (-price, -entry[1]))
+            self.low_size += 1
+        else:
+            heapq.heappush(self.high, entry)
+            self.high_size += 1
+        self.balance()
+
+    def expire(self, price, amount=0.0):
+        self.prune()
+        entry = (price, self.expired)
+        self.expired += 1
+        if self.low_size and entry <= (-self.low[0][0], -self.low[0][1]):
+            self.low_size -= 1
+        else:
+            self.high_size -= 1
+        if len(self.low) + len(self.high) > 2 * (self.low_size + self.high_size) + SLACK:
+            self.compact()
+        self.balance()
+
+    """
+        pops expired entries off the top of both heaps
+    """
+    def prune(self):
+        low, high, expired = self.low, self.high, self.expired
+        while low and -low[0][1] < expired:
+            heapq.heappop(low)
+        while high and high[0][1] < expired:
+            heapq.heappop(high)
+
+    """
+        rebuilds both heaps without their expired entries
+    """
+    def compact(self):
+        self.low  = [entry for entry in self.low  if -entry[1] >= self.expired]
+        self.high = [entry for entry in self.high if entry[1]  >= self.expired]
+        heapq.heapify(self.low)
+        heapq.heapify(self.high)
+
+    """
+        moves tops between the heaps until low holds the ceil(q * n) smallest live prices
+    """
+    def balance(self):
+        count  = self.low_size + self.high_size
+        target = max(int(math.ceil(self.q * count)), 1) if count else 0
+        while self.low_size > target:
+            self.prune()
+            price, number = heapq.heappop(self.low)
+            heapq.heappush(self.high, (-price, -number))
+            self.low_size  -= 1
+            self.high_size += 1
+        while self.low_size < target:
+            self.prune()
+            price, number = heapq.heappop(self.high)
+            heapq.heappush(self.low, (-price, -number))
+            self.low_size  += 1
+            self.high_size -= 1
+        self.prune()
+
+    def value(self):
+        return -self.low[0][0] if self.low_size else None
+
+"""
+    class used as the median price of the window, the mean of the two middle prices
+    when the window holds an even number of trades
+"""
+class RollingMedian(RollingQuantile):
+
+    def __init__(self):
+        RollingQuantile.__init__(self, 0.5)
+
+    def value(self):
+        if not self.low_size: return None
+        if self.high_size < self.low_size: return -self.low[0][0]
+        return (-self.low[0][0] + self.high[0][0]) / 2
@@ -6,103 +6,417 @@
     RecentTrades class used to store recent trade history and calculate values 
 """
 
-import time
 import threading
+from collections import namedtuple
+from src.clock import WallClock
+from src.trade import BUY, price_string
+from src.trade_buffer import TradeBuffer
+from src.sketches import WindowSketch
+from src.order_stats import RollingMin, RollingMax, RollingMedian
 
-CLEANUP_INTERVAL = 30
+# seconds between exact recalculations of the running sums, sheds floating point drift
+RECALC_INTERVAL = 300
+
+# immutable views of the aggregates, a new one is published after every write
+Snapshot        = namedtuple('Snapshot', ['version', 'price', 'expires', 'trackers'])
+TrackerSnapshot = namedtuple('TrackerSnapshot', ['age', 'count', 'volume', 'price_volume', 'average_price',
+                                                 'vwap', 'buy_volume', 'sell_volume', 'buy_count', 'sell_count',
+                                                 'imbalance', 'indicators', 'percentiles'])
 
 """
-    class used as an in-memory container for recent trades
+    class used as an in-memory container for recent trades.
+    writers (store_trade from the websocket thread, run_calculations from the main loop)
+    serialize on a lock and finish by publishing a new immutable Snapshot; readers only
+    ever fetch self.latest, a single atomic reference read, so they never take the lock
+    and never see a half-updated tracker
 """
 class RecentTrades():
-    #TODO: comment this class and its functions
-    def __init__(self):
-        self.new_trade = False
+    """
+        params:
+            clock (WallClock) - clock used to expire trades between trades and to time
+                recalculations, defaults to a WallClock
+            updated (threading.Event) - set whenever new trades are published, can be shared
+                between several RecentTrades, defaults to a new event
+    """
+    def __init__(self, clock=None, updated=None):
+        if clock == None: clock = WallClock()
+        self.clock         = clock
+        self.updated       = updated if updated != None else threading.Event()
         self.price_string  = '0'
         self.recent_trades = {}
+        # one time-ordered columnar store shared by every tracker, trackers keep a cursor into it
+        self.store       = TradeBuffer()
+        self.last_recalc = clock.monotonic()
+        self.lock        = threading.Lock()
+        self.latest      = Snapshot(0, self.price_string, float('inf'), {})
+        self.listeners   = []
+        # every tracker's indicators, every one of them is fed each new trade
+        self.indicators  = []
+        self.sketches    = []
+
+    """
+        adds a window of the most recent age seconds of trades
+        params:
+            name (string) - name of the tracker
+            age (float) - length of the window in seconds
+            order_stats (bool) - also keep the window's exact low, high and median price
+                (see src/order_stats.py), published as the 'Low', 'High' and 'Median'
+                indicators; O(log n) per trade and per expiry, defaults to False
+            sketch (bool) - also keep approximate price and trade size percentiles in bounded
+                memory (see src/sketches.py), published as the snapshot's percentiles once
+                run_calculations has refreshed them; meant for long windows where order_stats
+                would hold too much, defaults to False
+    """
+    def add_tracker(self, name, age, order_stats=False, sketch=False):
+        with self.lock:
+            self.recent_trades[name] = {
+                'age':           age,
+                'start':         self.store.end,
+                'volume':        0.0,
+                'price_volume':  0.0,
+                'price_sum':     0.0,
+                'count':         0,
+                'buy_volume':    0.0,
+                'buy_count':     0,
+                'indicators':    {},
+                'windowed':      [],
+                'sketch':        WindowSketch(age) if sketch else None
+            }
+            if sketch: self.sketches.append(self.recent_trades[name]['sketch'])
+            self.publish()
+        if order_stats:
+            self.add_indicator(name, 'Low', RollingMin())
+            self.add_indicator(name, 'High', RollingMax())
+            self.add_indicator(name, 'Median', RollingMedian())
+
+    """
+        registers a streaming indicator (see src/indicators.py) on a tracker. it is backfilled
+        with the trades already in the window in one batch, then fed every trade that enters
+        the window and, if it is windowed, every trade that expires from it. its value is
+        published in the tracker's snapshot under name
+        params:
+            tracker (string) - name of the tracker
+            name (string) - name to publish the value under
+            indicator (Indicator) - the indicator
+    """
+    def add_indicator(self, tracker, name, indicator):
+        with self.lock:
+            tracker = self.recent_trades[tracker]
+            if tracker['start'] < self.store.end:
+                indicator.update_batch(*self.store.columns(tracker['start'], self.store.end))
+            tracker['indicators'][name] = indicator
+            self.indicators.append(indicator)
+            if indicator.windowed: tracker['windowed'].append(indicator)
+            self.publish()
 
-        cleanup_thread = threading.Thread(target=self.remove_old_trades)
-        cleanup_thread.daemon = True
-        cleanup_thread.start()
+    """
+        registers a function to call with every snapshot published by a write, after the
+        lock is released. it runs on the writing thread (the websocket thread for
+        store_trade, the main loop for run_calculations), so it has to be thread safe and quick
+        params:
+            listener (function) - called with (Snapshot, list), the list holds the trades
+                just stored, oldest first, and is empty when trades only expired
+    """
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def notify_listeners(self, snapshot, trades):
+        for listener in self.listeners:
+            listener(snapshot, trades)
+
+    """
+        builds a fresh snapshot of every tracker and swaps it in, must hold self.lock.
+        the snapshot records when the next trade will age out of a window so a reader
+        knows when to call run_calculations without polling
+        params:
+            notify (bool) - set self.updated, defaults to True
+    """
+    def publish(self, notify=True):
+        trackers = {}
+        expires  = float('inf')
+        for name, tracker in self.recent_trades.items():
+            count, volume, buy_count = tracker['count'], tracker['volume'], tracker['buy_count']
+            if count:
+                average_price = tracker['price_sum'] / count
+                vwap          = tracker['price_volume'] / volume if volume > 0.0 else 0.0
+                # net buys as a fraction of trades, 1 when every trade was a buy and -1 when every one was a sell
+                imbalance     = (2 * buy_count - count) / count
+            else:
+                average_price = vwap = imbalance = 0.0
+            trackers[name] = TrackerSnapshot(tracker['age'], count, volume, tracker['price_volume'],
+                                             average_price, vwap, tracker['buy_volume'],
+                                             volume - tracker['buy_volume'], buy_count, count - buy_count, imbalance,
+                                             {key: indicator.value() for key, indicator in tracker['indicators'].items()},
+                                             tracker['sketch'].value() if tracker['sketch'] != None else None)
+            if tracker['start'] < self.store.end:
+                expires = min(expires, self.store.timestamp(tracker['start']) + tracker['age'])
+        self.latest = Snapshot(self.latest.version + 1, self.price_string, expires, trackers)
+        if notify: self.updated.set()
 
-    def add_tracker(self, name, age):
-        self.recent_trades[name] = {
-            'age':           age,
-            'trades':         [],
-            'volume':        0.0,
-            'price_volume':  0.0,
-            'average_price': 0.0
-        }
+    """
+        return:
+            (Snapshot) - consistent view of the price and every tracker, safe to read from any thread
+    """
+    def snapshot(self):
+        return self.latest
 
     def price(self):
-        return self.price_string
+        return self.latest.price
 
     def age(self, name):
-        return self.recent_trades[name]['age']
+        return self.latest.trackers[name].age
 
     def trackers(self):
-        return [key for key in self.recent_trades]
-
-    def trades(self, name, trades=None, append=False):
-        if trades == None:
-            return self.recent_trades[name]['trades']
-        else:
-            if append:
-                self.recent_trades[name]['trades'].append(trades)
-            else:
-                self.recent_trades[name]['trades'] = trades
+        return [key for key in self.latest.trackers]
+
+    def max_age(self):
+        return max([tracker.age for tracker in self.latest.trackers.values()] or [0])
+
+    def trades(self, name):
+        with self.lock:
+            return [self.store.trade(index) for index in range(self.recent_trades[name]['start'], self.store.end)]
     
-    def volume(self, name, volume=None):
-        if volume == None:
-            return self.recent_trades[name]['volume']
-        else:
-            self.recent_trades[name]['volume'] = volume
-
-    def price_volume(self, name, volume=None):
-        if volume == None:
-            return self.recent_trades[name]['price_volume']
-        else:
-            self.recent_trades[name]['price_volume'] = volume
-
-    def average_price(self, name, price=None):
-        if price == None:
-            return self.recent_trades[name]['average_price']
-        else:
-            self.recent_trades[name]['average_price'] = price
-
-    def remove_old_trades(self):
-        while True:
-            cur_time = time.time()
-            for tracker in self.trackers():
-                num_trades = len(self.trades(tracker))
-                self.trades(tracker,
-                    [trade for trade in self.trades(tracker) if int(trade['timestamp']) > cur_time - self.age(tracker)]
-                )
-                if len(self.trades(tracker)) < num_trades: self.new_trade = True
-            time.sleep(CLEANUP_INTERVAL)
+    def volume(self, name):
+        return self.latest.trackers[name].volume
+
+    def price_volume(self, name):
+        return self.latest.trackers[name].price_volume
+
+    def average_price(self, name):
+        return self.latest.trackers[name].average_price
+
+    def count(self, name):
+        return self.latest.trackers[name].count
 
+    def vwap(self, name):
+        return self.latest.trackers[name].vwap
+
+    def buy_volume(self, name):
+        return self.latest.trackers[name].buy_volume
+
+    def sell_volume(self, name):
+        return self.latest.trackers[name].sell_volume
+
+    def imbalance(self, name):
+        return self.latest.trackers[name].imbalance
+
+    """
+        adds (sign=1) or subtracts (sign=-1) a trade's contribution to the running
+        sums of a tracker, keeping volume, price_volume, average_price, vwap and the
+        buy/sell split O(1) to read
+        params:
+            name (string) - name of the tracker
+            price (float) - price of the trade
+            amount (float) - amount traded
+            side (int) - BUY or SELL
+            sign (int) - 1 when a trade enters the window, -1 when it expires
+    """
+    def update_sums(self, name, price, amount, side, sign):
+        tracker = self.recent_trades[name]
+        amount *= sign
+        tracker['volume']       += amount
+        tracker['price_volume'] += amount * price
+        tracker['price_sum']    += sign * price
+        tracker['count']        += sign
+        if side == BUY:
+            tracker['buy_volume'] += amount
+            tracker['buy_count']  += sign
+        if tracker['count'] == 0: self.reset_sums(tracker)
+
+    """
+        adds already summed values to a tracker's running sums, negative values subtract.
+        sells are whatever isn't a buy, so only the buys are summed; the averages are
+        derived from the sums once per publish rather than on every add
+        params:
+            name (string) - name of the tracker
+            volume (float) - summed amounts
+            price_volume (float) - summed price * amount
+            price_sum (float) - summed prices
+            count (int) - number of trades summed
+            buy_volume (float) - summed amounts of the buys
+            buy_count (int) - number of buys summed
+    """
+    def add_sums(self, name, volume, price_volume, price_sum, count, buy_volume, buy_count):
+        tracker = self.recent_trades[name]
+        tracker['volume']       += volume
+        tracker['price_volume'] += price_volume
+        tracker['price_sum']    += price_sum
+        tracker['count']        += count
+        tracker['buy_volume']   += buy_volume
+        tracker['buy_count']    += buy_count
+        if tracker['count'] == 0: self.reset_sums(tracker)
+
+    """
+        zeroes an empty tracker's float sums so floating point drift can't build up in an empty window
+        params:
+            tracker (dict) - the tracker
+    """
+    def reset_sums(self, tracker):
+        tracker['volume']       = 0.0
+        tracker['price_volume'] = 0.0
+        tracker['price_sum']    = 0.0
+        tracker['buy_volume']   = 0.0
+
+    """
+        recomputes a tracker's sums exactly from the stored columns (vectorized when
+        numpy is installed), replacing whatever rounding error the running sums picked up.
+        must hold self.lock
+        params:
+            name (string) - name of the tracker
+    """
+    def recalculate(self, name):
+        tracker = self.recent_trades[name]
+        tracker['volume'], tracker['price_volume'], tracker['price_sum'], tracker['buy_volume'], \
+            tracker['buy_count'] = self.store.sums(tracker['start'], self.store.end)
+        tracker['count'] = self.store.end - tracker['start']
+
+    """
+        advances each tracker's cursor past the trades that have aged out of its window;
+        trades arrive in timestamp order, so the cost scales with the number of expired
+        trades rather than the size of the window. the head of the shared store is
+        dropped once every tracker has moved past it
+        must hold self.lock
+        params:
+            cur_time (float) - time to expire trades against, defaults to self.clock.time()
+        return:
+            (bool) - True if any trade expired
+    """
+    def remove_old_trades(self, cur_time=None):
+        if cur_time == None: cur_time = self.clock.time()
+        store   = self.store
+        oldest  = store.end
+        expired = False
+        for name, tracker in self.recent_trades.items():
+            start  = tracker['start']
+            cutoff = cur_time - tracker['age']
+            windowed = tracker['windowed']
+            while start < store.end and store.timestamp(start) <= cutoff:
+                price, amount = store.price(start), store.amount(start)
+                self.update_sums(name, price, amount, store.side(start), -1)
+                for indicator in windowed:
+                    indicator.expire(price, amount)
+                start += 1
+            if tracker['sketch'] != None: tracker['sketch'].expire(cutoff)
+            expired = expired or start != tracker['start']
+            tracker['start'] = start
+            oldest = min(oldest, start)
+        store.discard(oldest)
+        return expired
+
+    """
+        the aggregates are kept up to date by store_trade and remove_old_trades,
+        so this only has to expire trades that have aged out since the last call
+        and every RECALC_INTERVAL resync the running sums. sketch percentiles are
+        refreshed first, see refresh_sketches.
+        the lock is only tried, never waited on: if the websocket thread is mid-write
+        it expires trades itself, so this tick can be skipped.
+        self.updated isn't set, the caller is the reader that would be woken
+    """
     def run_calculations(self):
-        if self.new_trade:
-            for tracker in self.trackers():
-                temp_volume    = 0.0
-                temp_price_vol = 0.0
-                temp_avg_price = 0.0
-                temp_avg_count = 0
-                for trade in self.trades(tracker):
-                    temp_volume    += trade['amount']
-                    temp_price_vol += trade['amount'] * trade['price']
-                    temp_avg_price += trade['price']
-                    temp_avg_count += 1
-
-                temp_avg_price /= temp_avg_count
-                self.volume(tracker, temp_volume)
-                self.price_volume(tracker, temp_price_vol)
-                self.average_price(tracker, temp_avg_price)
-                self.new_trade = False
+        refreshed = self.refresh_sketches()
+        if not self.lock.acquire(blocking=False): return
+        try:
+            changed = self.remove_old_trades() or refreshed
+            now     = self.clock.monotonic()
+            if now - self.last_recalc >= RECALC_INTERVAL:
+                for tracker in self.recent_trades:
+                    self.recalculate(tracker)
+                self.last_recalc = now
+                changed = True
+            if changed: self.publish(notify=False)
+        finally:
+            self.lock.release()
+        if changed: self.notify_listeners(self.latest, [])
 
-    def store_trade(self, trade):
-        self.new_trade = True
-        self.price_string = trade['price_str']
-        for tracker in self.trackers():
-            self.trades(tracker, trade, True)
+    """
+        recomputes the percentiles of every sketch whose window has changed enough. only
+        capturing the sketches' state is done under the lock, it's a copy of each newest
+        bucket; the sort that reads percentiles out of it runs unlocked, so neither the
+        websocket thread nor readers wait on it. publish only copies the stored result
+        return:
+            (bool) - True if any percentiles were recomputed, they show up in the next snapshot
+    """
+    def refresh_sketches(self):
+        if not self.sketches or not self.lock.acquire(blocking=False): return False
+        try:
+            captured = [(sketch, sketch.capture()) for sketch in self.sketches if sketch.stale()]
+        finally:
+            self.lock.release()
+        for sketch, state in captured:
+            sketch.latest = sketch.compute(state)
+        return bool(captured)
+
+    """
+        stores a batch of trades, e.g. to warm start from the journal or during a replay.
+        the batch is appended with slice assignments, its sums are added to every tracker
+        in one vectorized pass, and each tracker's cursor is moved by binary search with
+        the expired range's sums subtracted in one pass, so nothing is done per trade
+        per tracker and a single snapshot is published. windowed indicators are only fed
+        the part of the batch that ends up in their window, so a long batch doesn't push
+        trades through a short window's order statistics just to expire them again
+        params:
+            trades (list) - Trades, oldest first and no older than anything already stored
+            cur_time (float) - time to expire trades against, defaults to the newest trade's
+                exchange timestamp
+    """
+    def store_trades(self, trades, cur_time=None):
+        if not trades: return
+        if cur_time == None: cur_time = trades[-1].timestamp
+        with self.lock:
+            store = self.store
+            begin = store.end
+            store.extend(trades)
+            self.price_string = price_string(trades[-1].price)
+            added  = store.sums(begin, store.end)
+            oldest = store.end
+            batch  = None
+            for name, tracker in self.recent_trades.items():
+                self.add_sums(name, added[0], added[1], added[2], len(trades), added[3], added[4])
+                start = store.search(cur_time - tracker['age'], tracker['start'], store.end)
+                # windowed indicators only see the part of the batch still in the window and only
+                # expire what was in it before, a trade that would enter and leave is skipped
+                if tracker['windowed'] and tracker['start'] < min(start, begin):
+                    columns = store.columns(tracker['start'], min(start, begin))
+                    for indicator in tracker['windowed']:
+                        indicator.expire_batch(*columns)
+                if tracker['indicators']:
+                    if batch == None: batch = store.columns(begin, store.end)
+                    skip = max(start - begin, 0)
+                    for indicator in tracker['indicators'].values():
+                        if not indicator.windowed: indicator.update_batch(*batch)
+                        elif skip < len(trades): indicator.update_batch(batch[0][skip:], batch[1][skip:])
+                if tracker['sketch'] != None:
+                    for trade in trades[max(start - begin, 0):]:
+                        tracker['sketch'].update(trade.timestamp, trade.price, trade.amount)
+                    tracker['sketch'].expire(cur_time - tracker['age'])
+                if start > tracker['start']:
+                    expired = store.sums(tracker['start'], start)
+                    self.add_sums(name, -expired[0], -expired[1], -expired[2], tracker['start'] - start,
+                                  -expired[3], -expired[4])
+                    tracker['start'] = start
+                oldest = min(oldest, start)
+            store.discard(oldest)
+            self.publish()
+            snapshot = self.latest
+        self.notify_listeners(snapshot, trades)
 
+    """
+        stores a trade in the shared store and adds it to every tracker's sums,
+        windows are expired against the trade's exchange timestamp
+        params:
+            trade (Trade) - the trade to store
+    """
+    def store_trade(self, trade):
+        with self.lock:
+            self.price_string = price_string(trade.price)
+            self.store.append(trade.timestamp, trade.price, trade.amount, trade.side)
+            for tracker in self.recent_trades:
+                self.update_sums(tracker, trade.price, trade.amount, trade.side, 1)
+            for indicator in self.indicators:
+                indicator.update(trade.price, trade.amount)
+            for sketch in self.sketches:
+                sketch.update(trade.timestamp, trade.price, trade.amount)
+            self.remove_old_trades(trade.timestamp)
+            self.publish()
+            snapshot = self.latest
+        if self.listeners: self.notify_listeners(snapshot, [trade])
@@ -0,0 +1,117 @@
+"""
+    Filename: replay.py
+    Author: Jim Craveiro <jim.craveiro@gmail.com>
+    Date: 10/17/2026
+
+    functions used to replay recorded trades through Client.on_trade with a simulated clock
+"""
+
+import json
+import time
+import heapq
+from src.decoder import JsonDecoder
+from src.journal import JournalReader, journal_files
+
+"""
+    decoder for replaying journal records, which are already Trades
+"""
+class RecordDecoder(JsonDecoder):
+    name = 'record'
+
+    def trade(self, data):
+        return data
+
+"""
+    function that iterates over every trade in a pair's journal
+    params:
+        path (string) - journal directory
+        pair (string) - bitstamp currency pair
+    return:
+        (generator) - Trades, oldest first
+"""
+def journal_trades(path, pair):
+    for filename in journal_files(path, pair):
+        with JournalReader(filename) as reader:
+            for trade in reader.trades():
+                yield trade
+
+"""
+    function that iterates over the trades in an old text trades.log,
+    one json encoded bitstamp trade per line
+    params:
+        filename (string) - path to the log
+    return:
+        (generator) - decoded trades as dicts, oldest first
+"""
+def log_trades(filename):
+    with open(filename, 'r') as file:
+        for line in file:
+            line = line.strip()
+            if line: yield json.loads(line)
+
+def record_time(trade):
+    return trade.timestamp
+
+def log_time(data):
+    if 'microtimestamp' in data: return int(data['microtimestamp']) / 1e6
+    return float(data['timestamp'])
+
+def tag(pair, trades, timestamp):
+    for trade in trades:
+        yield timestamp(trade), pair, trade
+
+"""
+    function that feeds recorded trades through client.on_trade in timestamp order,
+    advancing clock to each trade's time before it is stored
+    params:
+        client (Client) - client created with connect=False and a decoder matching the trades
+        sources (dict) - iterables of recorded trades keyed by currency pair
+        clock (SimulatedClock) - clock the client's RecentTrades were created with
+        timestamp (function) - returns a recorded trade's unix time, record_time for
+            journal trades and log_time for trades.log trades
+        speed (float) - multiple of real time to replay at, defaults to None: as fast as possible
+    return:
+        (int) - number of trades replayed
+"""
+def replay(client, sources, clock, timestamp, speed=None):
+    streams = [tag(pair, trades, timestamp) for pair, trades in sources.items()]
+    count      = 0
+    first      = None
+    wall_start = time.monotonic()
+    for trade_time, pair, trade in heapq.merge(*streams, key=lambda item: (item[0], item[1])):
+        if speed:
+            if first == None: first = trade_time
+            delay = (trade_time - first) / speed - (time.monotonic() - wall_start)
+            if delay > 0: time.sleep(delay)
+        clock.advance(trade_time)
+        client.on_trade(pair, trade)
+        count += 1
+    return count
+
+"""
+    function that replays recorded trades straight into RecentTrades.store_trades in batches,
+    skipping the per trade Client.on_trade path. pairs are independent so each is replayed
+    in turn; the clock ends at the newest trade replayed
+    params:
+        markets (dict) - RecentTrades keyed by currency pair
+        sources (dict) - iterables of Trades keyed by currency pair
+        clock (SimulatedClock) - clock the RecentTrades were created with
+        batch (int) - trades per store_trades call
+    return:
+        (int) - number of trades replayed
+"""
+def replay_batches(markets, sources, clock, batch):
+    count = 0
+    for pair, trades in sources.items():
+        chunk = []
+        trade = None
+        for trade in trades:
+            chunk.append(trade)
+            if len(chunk) == batch:
+                markets[pair].store_trades(chunk)
+                count += len(chunk)
+                chunk  = []
+        markets[pair].store_trades(chunk)
+        count += len(chunk)
+        if trade != None: clock.advance(trade.timestamp)
+    return count
@@ -0,0 +1,252 @@
+"""
+    Filename: sketches.py
+    Author: Jim Craveiro <jim.craveiro@gmail.com>
+    Date: 10/17/2026
+
+    streaming quantile sketches used to keep approximate price and trade size percentiles
+    over long tracker windows (24h, 7d) in memory that doesn't grow with the trade count
+"""
+
+import math
+import random
+from collections import deque, namedtuple
+
+# the sketch's accuracy parameter, see KLL
+K                = 200
+# sub-sketches per window, the window is covered a bucket at a time
+BUCKETS          = 24
+PERCENTILES      = [0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99]
+# percentiles are recomputed once trades added or expired since the last computation reach
+# this fraction of the window, which bounds how stale (in rank) a published percentile can be
+REFRESH_FRACTION = 0.005
+CAPACITY_DECAY   = 2.0 / 3.0
+
+# approximate percentiles of a window, each a dict keyed by quantile
+Percentiles = namedtuple('Percentiles', ['count', 'price', 'amount'])
+
+"""
+    class used as a KLL quantile sketch (Karnin, Lang and Liberty, "Optimal Quantile
+    Approximation in Streams", 2016). items are kept in a stack of compactors, level h
+    holding items that each stand for 2^h inputs; when the sketch is full the lowest full
+    compactor is sorted and every other item (odd or even, at random) is promoted a level.
+    the top compactor holds about k items and each level below 2/3 as many as the one
+    above, so the sketch keeps O(k) items however many it has seen. sketches with the
+    same k can be merged by concatenating their levels.
+    with k = 200 the rank error is about 1.65% of the item count (99% confidence), the
+    same bound as the KLL in Apache DataSketches; it shrinks about linearly in 1/k
+"""
+class KLL():
+
+    def __init__(self, k=K, rng=random):
+        self.k          = k
+        self.rng        = rng
+        self.compactors = []
+        self.size       = 0
+        self.max_size   = 0
+        self.count      = 0
+        self.grow()
+
+    def __len__(self):
+        return self.count
+
+    def grow(self):
+        self.compactors.append([])
+        self.max_size = sum(self.capacity(height) for height in range(len(self.compactors)))
+
+    def capacity(self, height):
+        depth = len(self.compactors) - height - 1
+        return int(math.ceil(CAPACITY_DECAY ** depth * self.k)) + 1
+
+    def update(self, item):
+        self.compactors[0].append(item)
+        self.size  += 1
+        self.count += 1
+        if self.size >= self.max_size: self.compress()
+
+    """
+        compacts the lowest compactor over its capacity, halving it into the level above
+    """
+    def compress(self):
+        for height, compactor in enumerate(self.compactors):
+            if len(compactor) < self.capacity(height): continue
+            if height + 1 == len(self.compactors): self.grow()
+            compactor.sort()
+            # an odd item out stays behind, the rest are paired and one of each pair promoted
+            keep  = compactor[:len(compactor) % 2]
+            start = len(keep) + self.rng.randint(0, 1)
+            self.compactors[height + 1].extend(compactor[start::2])
+            self.compactors[height] = keep
+            self.size = sum(len(level) for level in self.compactors)
+            return
+
+    """
+        folds another sketch into this one
+        params:
+            other (KLL) - sketch with the same k
+    """
+    def merge(self, other):
+        while len(self.compactors) < len(other.compactors): self.grow()
+        for height, compactor in enumerate(other.compactors):
+            self.compactors[height].extend(compactor)
+        self.count += other.count
+        self.size   = sum(len(level) for level in self.compactors)
+        while self.size >= self.max_size: self.compress()
+
+    """
+        return:
+            (generator) - (item, weight) for every item kept, weight being the inputs it stands for
+    """
+    def weighted(self):
+        for height, compactor in enumerate(self.compactors):
+            weight = 1 << height
+            for item in compactor:
+                yield item, weight
+
+"""
+    function that reads quantiles out of weighted items from any number of sketches, without
+    merging them (merging would compact again and add error)
+    params:
+        weighted (list) - (item, weight) pairs
+        quantiles (list) - quantiles wanted, 0 <= q <= 1
+    return:
+        (dict) - the item at each quantile's rank, keyed by quantile, empty without items
+"""
+def weighted_quantiles(weighted, quantiles):
+    if not weighted: return {}
+    weighted.sort()
+    total   = sum(weight for item, weight in weighted)
+    targets = sorted(quantiles)
+    result  = {}
+    index   = 0
+    rank    = 0
+    for item, weight in weighted:
+        rank += weight
+        while index < len(targets) and rank >= targets[index] * total:
+            result[targets[index]] = item
+            index += 1
+        if index == len(targets): break
+    for quantile in targets[index:]:
+        result[quantile] = weighted[-1][0]
+    return result
+
+"""
+    class used to keep approximate price and trade size percentiles over a tracker's window.
+    the window is split into time buckets of age / buckets seconds, each with its own pair of
+    KLL sketches; trades go into the newest bucket and a bucket is dropped as a whole once its
+    whole span has aged out, so expiry is O(1) and memory is O(buckets * k) whatever the
+    trade rate. percentiles are read off the union of the buckets' sketches.
+    error, on top of the sketches' rank error (about 1.65% at k = 200):
+        - the window can include up to one bucket (age / buckets) of older trades
+        - published percentiles are recomputed off the write path (RecentTrades.refresh_sketches,
+          from the main loop) once refresh of the window has changed, so they lag by that
+          fraction of the window plus up to a main loop tick
+"""
+class WindowSketch():
+
+    """
+        params:
+            age (float) - length of the window in seconds
+            buckets (int) - sub-sketches per window, defaults to BUCKETS
+            k (int) - KLL accuracy parameter, defaults to K
+            quantiles (list) - percentiles to publish, as fractions, defaults to PERCENTILES
+            refresh (float) - fraction of the window that has to change before the percentiles
+                are recomputed, defaults to REFRESH_FRACTION
+    """
+    def __init__(self, age, buckets=BUCKETS, k=K, quantiles=PERCENTILES, refresh=REFRESH_FRACTION):
+        self.span      = age / buckets
+        self.k         = k
+        self.quantiles = quantiles
+        self.refresh   = refresh
+        self.buckets   = deque()
+        self.count     = 0
+        self.changes   = 0
+        self.latest    = None
+
+    """
+        params:
+            timestamp (float) - unix time of the trade
+            price (float) - price of the trade
+            amount (float) - amount traded
+    """
+    def update(self, timestamp, price, amount):
+        buckets = self.buckets
+        if not buckets or timestamp >= buckets[-1][0] + self.span:
+            buckets.append([timestamp - timestamp % self.span, KLL(self.k), KLL(self.k)])
+        bucket = buckets[-1]
+        bucket[1].update(price)
+        bucket[2].update(amount)
+        self.count   += 1
+        self.changes += 1
+
+    """
+        drops the buckets whose whole span is at or before cutoff
+        params:
+            cutoff (float) - unix time, trades at or before it are out of the window
+    """
+    def expire(self, cutoff):
+        buckets = self.buckets
+        while buckets and buckets[0][0] + self.span <= cutoff:
+            count = len(buckets.popleft()[1])
+            self.count   -= count
+            self.changes += count
+
+    """
+        return:
+            (int) - items kept by every sketch, a measure of memory use
+    """
+    def size(self):
+        return sum(bucket[1].size + bucket[2].size for bucket in self.buckets)
+
+    """
+        return:
+            (bool) - whether enough of the window changed since the last capture() that the
+                     published percentiles should be recomputed
+    """
+    def stale(self):
+        return self.changes > self.refresh * self.count or (self.latest == None and self.count > 0)
+
+    """
+        takes what compute() needs to read the window's percentiles. buckets other than the
+        newest are never written to again, so only the newest one's levels are copied, a few
+        hundred items; the caller holds whatever lock serializes update() and expire()
+        return:
+            (tuple) - (count, [(price levels, amount levels)] per bucket), None while the window is empty
+    """
+    def capture(self):
+        self.changes = 0
+        if not self.count: return None
+        levels = [(bucket[1].compactors, bucket[2].compactors) for bucket in self.buckets]
+        newest = self.buckets[-1]
+        levels[-1] = ([list(level) for level in newest[1].compactors],
+                      [list(level) for level in newest[2].compactors])
+        return self.count, levels
+
+    """
+        reads percentiles out of a capture(). this is the expensive part, a sort of every item
+        the window's sketches keep, and needs no lock
+        params:
+            captured (tuple) - as returned by capture()
+        return:
+            (Percentiles) - the window's price and trade size percentiles, None for an empty window
+    """
+    def compute(self, captured):
+        if captured == None: return None
+        count, levels = captured
+        weighted = ([(item, 1 << height) for pair in levels for height, level in enumerate(pair[field])
+                     for item in level] for field in (0, 1))
+        return Percentiles(count, *[weighted_quantiles(items, self.quantiles) for items in weighted])
+
+    """
+        return:
+            (Percentiles) - the window's percentiles computed now, None while it is empty
+    """
+    def percentiles(self):
+        return self.compute(self.capture())
+
+    """
+        return:
+            (Percentiles) - the percentiles last stored in self.latest (see RecentTrades.refresh_sketches),
+                            so reading them never sorts anything
+    """
+    def value(self):
+        return self.latest if self.count else None
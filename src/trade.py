@@ -0,0 +1,68 @@
+"""
+    Filename: trade.py
+    Author: Jim Craveiro <jim.craveiro@gmail.com>
+    Date: 10/17/2026
+
+    Trade record used to pass single trades around without the full bitstamp payload
+"""
+
+# bitstamp's trade 'type' field
+BUY  = 0
+SELL = 1
+# most decimal places bitstamp quotes a price with
+PRICE_DECIMALS = 8
+
+"""
+    function that formats a price the way bitstamp's price_str does, as a plain decimal:
+    str() of a float switches to scientific notation below 1e-4
+    params:
+        price (float) - the price
+    return:
+        (string) - price with up to PRICE_DECIMALS decimal places and no trailing zeros
+"""
+def price_string(price):
+    return '{:.{}f}'.format(price, PRICE_DECIMALS).rstrip('0').rstrip('.')
+
+"""
+    class holding the fields of a trade that the bot actually uses,
+    __slots__ keeps each instance to a handful of machine words
+"""
+class Trade():
+    __slots__ = ('timestamp', 'price', 'amount', 'side', 'id')
+
+    """
+        params:
+            timestamp (float) - unix time of the trade in seconds
+            price (float) - price the trade executed at
+            amount (float) - amount of the base currency traded
+            side (int) - BUY or SELL, defaults to BUY
+            id (int) - bitstamp trade id, defaults to 0 when unknown
+    """
+    def __init__(self, timestamp, price, amount, side=BUY, id=0):
+        self.timestamp = timestamp
+        self.price     = price
+        self.amount    = amount
+        self.side      = side
+        self.id        = id
+
+    """
+        builds a trade from a decoded bitstamp trade event
+        params:
+            data (dict) - decoded trade, bitstamp's api docs can be found here:
+                https://www.bitstamp.net/websocket/
+        return:
+            (Trade) - the trade, timestamped to the microsecond when bitstamp provides it
+    """
+    @classmethod
+    def from_bitstamp(cls, data):
+        if 'microtimestamp' in data:
+            timestamp = int(data['microtimestamp']) / 1e6
+        else:
+            timestamp = float(data['timestamp'])
+        return cls(timestamp, float(data['price']), float(data['amount']),
+                   int(data.get('type', BUY)), int(data.get('id', 0)))
+
+    def __repr__(self):
+        return 'Trade(timestamp={}, price={}, amount={}, side={}, id={})'.format(
+            self.timestamp, self.price, self.amount, self.side, self.id
+        )
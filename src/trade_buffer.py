@@ -0,0 +1,215 @@
+"""
+    Filename: trade_buffer.py
+    Author: Jim Craveiro <jim.craveiro@gmail.com>
+    Date: 10/17/2026
+
+    TradeBuffer class used to store trades column-wise in typed ring buffers
+"""
+
+import math
+from array import array
+from src.trade import Trade
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+INITIAL_CAPACITY = 1024
+
+"""
+    class used as a growable ring buffer of trades, stored as parallel typed arrays
+    (8 bytes each for timestamp, price and amount plus 1 byte for side, ~25 bytes a trade).
+    trades are addressed by absolute index: the index a trade was given when appended
+    stays valid until it is discarded, so callers can hold cursors into the buffer
+"""
+class TradeBuffer():
+
+    def __init__(self, capacity=INITIAL_CAPACITY):
+        capacity = 1 << max(capacity - 1, 1).bit_length()
+        self.timestamps = array('d', [0.0]) * capacity
+        self.prices     = array('d', [0.0]) * capacity
+        self.amounts    = array('d', [0.0]) * capacity
+        self.sides      = array('b', [0])   * capacity
+        self.mask   = capacity - 1
+        self.offset = 0
+        self.start  = 0
+        self.end    = 0
+
+    def __len__(self):
+        return self.end - self.start
+
+    def capacity(self):
+        return self.mask + 1
+
+    def timestamp(self, index):
+        return self.timestamps[(index - self.offset) & self.mask]
+
+    def price(self, index):
+        return self.prices[(index - self.offset) & self.mask]
+
+    def amount(self, index):
+        return self.amounts[(index - self.offset) & self.mask]
+
+    def side(self, index):
+        return self.sides[(index - self.offset) & self.mask]
+
+    def trade(self, index):
+        pos = (index - self.offset) & self.mask
+        return Trade(self.timestamps[pos], self.prices[pos], self.amounts[pos], self.sides[pos])
+
+    """
+        appends a trade to the end of the buffer, doubling its capacity when full
+        params:
+            timestamp (float) - unix time of the trade
+            price (float) - price of the trade
+            amount (float) - amount traded
+            side (int) - BUY or SELL
+        return:
+            (int) - absolute index of the stored trade
+    """
+    def append(self, timestamp, price, amount, side):
+        if self.end - self.start > self.mask: self.grow()
+        pos = (self.end - self.offset) & self.mask
+        self.timestamps[pos] = timestamp
+        self.prices[pos]     = price
+        self.amounts[pos]    = amount
+        self.sides[pos]      = side
+        self.end += 1
+        return self.end - 1
+
+    """
+        appends a batch of trades with slice assignments instead of one trade at a time
+        params:
+            trades (list) - Trades, oldest first
+    """
+    def extend(self, trades):
+        count = len(trades)
+        while self.end - self.start + count > self.mask + 1: self.grow()
+        columns = [
+            (self.timestamps, array('d', [trade.timestamp for trade in trades])),
+            (self.prices,     array('d', [trade.price     for trade in trades])),
+            (self.amounts,    array('d', [trade.amount    for trade in trades])),
+            (self.sides,      array('b', [trade.side      for trade in trades]))
+        ]
+        pos   = (self.end - self.offset) & self.mask
+        first = min(count, self.mask + 1 - pos)
+        for column, values in columns:
+            column[pos:pos + first] = values[:first]
+            column[:count - first]  = values[first:]
+        self.end += count
+
+    """
+        binary search for the first trade in the absolute range [begin, end) with a timestamp
+        after the given time, relies on trades being stored in timestamp order
+        params:
+            timestamp (float) - unix time
+            begin (int) - absolute index to search from
+            end (int) - absolute index to search to
+        return:
+            (int) - absolute index of the first later trade, end if there is none
+    """
+    def search(self, timestamp, begin, end):
+        while begin < end:
+            middle = (begin + end) // 2
+            if self.timestamps[(middle - self.offset) & self.mask] <= timestamp: begin = middle + 1
+            else: end = middle
+        return begin
+
+    """
+        drops every trade before the given absolute index
+        params:
+            index (int) - absolute index of the first trade to keep
+    """
+    def discard(self, index):
+        self.start = min(max(self.start, index), self.end)
+
+    def grow(self):
+        columns = [self.segments(column, self.start, self.end)
+                   for column in (self.timestamps, self.prices, self.amounts, self.sides)]
+        capacity = (self.mask + 1) * 2
+        self.timestamps, self.prices, self.amounts, self.sides = [
+            self.join(segments, capacity) for segments in columns
+        ]
+        self.mask   = capacity - 1
+        self.offset = self.start
+
+    @staticmethod
+    def join(segments, capacity):
+        column = segments[0] + segments[1]
+        column.extend(array(column.typecode, [0]) * (capacity - len(column)))
+        return column
+
+    """
+        slices a column for the absolute range [begin, end) out of the ring,
+        the range wraps at most once so it comes back as two contiguous segments
+        params:
+            column (array or memoryview) - one of the buffer's columns
+            begin (int) - absolute index of the first trade
+            end (int) - absolute index one past the last trade
+        return:
+            (list) - two slices of column, the second empty unless the range wraps
+    """
+    def segments(self, column, begin, end):
+        if begin >= end: return [column[:0], column[:0]]
+        first = (begin - self.offset) & self.mask
+        last  = (end   - self.offset) & self.mask
+        if first < last:
+            return [column[first:last], column[:0]]
+        return [column[first:], column[:last]]
+
+    """
+        copies price and amount for the absolute range [begin, end) out of the ring
+        params:
+            begin (int) - absolute index of the first trade
+            end (int) - absolute index one past the last trade
+        return:
+            (tuple) - (prices, amounts), numpy arrays when numpy is installed, array('d')s otherwise
+    """
+    def columns(self, begin, end):
+        prices  = self.segments(self.prices,  begin, end)
+        amounts = self.segments(self.amounts, begin, end)
+        if numpy != None:
+            return (numpy.concatenate([numpy.frombuffer(segment, dtype=numpy.float64) for segment in prices]),
+                    numpy.concatenate([numpy.frombuffer(segment, dtype=numpy.float64) for segment in amounts]))
+        return prices[0] + prices[1], amounts[0] + amounts[1]
+
+    """
+        sums of amount, price * amount, price and the amount and number of buys over the
+        absolute range [begin, end), vectorized with numpy when it is installed and computed
+        with math.fsum otherwise
+        params:
+            begin (int) - absolute index of the first trade
+            end (int) - absolute index one past the last trade
+        return:
+            (tuple) - (volume, price_volume, price_sum, buy_volume, buy_count)
+    """
+    def sums(self, begin, end):
+        volume = price_volume = price_sum = buy_volume = 0.0
+        # memoryviews so the segments are zero-copy windows onto the columns
+        prices  = self.segments(memoryview(self.prices),  begin, end)
+        amounts = self.segments(memoryview(self.amounts), begin, end)
+        sides   = self.segments(memoryview(self.sides),   begin, end)
+        # sides are BUY (0) or SELL (1), so summing them counts the sells
+        sells   = 0
+        if numpy != None:
+            for price, amount, side in zip(prices, amounts, sides):
+                if not len(price): continue
+                price  = numpy.frombuffer(price,  dtype=numpy.float64)
+                amount = numpy.frombuffer(amount, dtype=numpy.float64)
+                side   = numpy.frombuffer(side,   dtype=numpy.int8)
+                total  = float(amount.sum())
+                volume       += total
+                price_volume += float(price.dot(amount))
+                price_sum    += float(price.sum())
+                buy_volume   += total - float(amount.dot(side))
+                sells        += int(side.sum())
+            return volume, price_volume, price_sum, buy_volume, max(end - begin, 0) - sells
+
+        for price, amount, side in zip(prices, amounts, sides):
+            volume       += math.fsum(amount)
+            price_volume += math.fsum(map(float.__mul__, price, amount))
+            price_sum    += math.fsum(price)
+            buy_volume   += math.fsum([value for value, sell in zip(amount, side) if sell == 0])
+            sells        += sum(side)
+        return volume, price_volume, price_sum, buy_volume, max(end - begin, 0) - sells
@@ -0,0 +1,69 @@
+"""
+    Filename: warm_start.py
+    Author: Jim Craveiro <jim.craveiro@gmail.com>
+    Date: 10/17/2026
+
+    functions used to rebuild RecentTrades windows on startup from the journal and bitstamp's rest api
+"""
+
+import logging
+import requests
+from src.trade import Trade
+from src.journal import read_since
+
+BITSTAMP_TRANSACTIONS_URL = 'https://www.bitstamp.net/api/v2/transactions/{}/'
+# the 'time' values bitstamp's transactions endpoint accepts and how far back they reach
+TRANSACTION_WINDOWS       = [('minute', 60), ('hour', 3600), ('day', 86400)]
+# a journal whose newest trade is older than this is assumed to be missing trades
+MAX_JOURNAL_GAP           = 60
+
+"""
+    function that fetches a pair's recent trades from bitstamp's transactions endpoint
+    params:
+        pair (string) - bitstamp currency pair, e.g. 'xrpusd'
+        age (float) - seconds of history wanted, the smallest window covering it is requested
+    return:
+        (list) - Trades, oldest first
+"""
+def fetch_transactions(pair, age):
+    window = TRANSACTION_WINDOWS[-1][0]
+    for name, seconds in TRANSACTION_WINDOWS:
+        if age <= seconds:
+            window = name
+            break
+    response = requests.get(BITSTAMP_TRANSACTIONS_URL.format(pair), params={'time': window}, timeout=10)
+    response.raise_for_status()
+    trades = [Trade(float(item['date']), float(item['price']), float(item['amount']),
+                    int(item['type']), int(item['tid'])) for item in response.json()]
+    trades.sort(key=lambda trade: trade.timestamp)
+    return trades
+
+"""
+    function that fills a RecentTrades with the trades its longest tracker window covers.
+    the journal is tail-read first; if it has nothing recent (the bot was down, or there is
+    no journal yet) the rest of the window is filled from fetcher
+    params:
+        recent_trades (RecentTrades) - container to fill, trackers should already be added
+        pair (string) - bitstamp currency pair
+        journal_path (string) - journal directory
+        fetcher (function) - called with (pair, age) for trades missing from the journal,
+            defaults to fetch_transactions, None to only use the journal
+        cur_time (float) - current time, defaults to recent_trades.clock.time()
+    return:
+        (int) - number of trades loaded
+"""
+def warm_start(recent_trades, pair, journal_path, fetcher=fetch_transactions, cur_time=None):
+    if cur_time == None: cur_time = recent_trades.clock.time()
+    since  = cur_time - recent_trades.max_age()
+    trades = read_since(journal_path, pair, since)
+
+    newest = trades[-1].timestamp if trades else since
+    if fetcher != None and cur_time - newest > MAX_JOURNAL_GAP:
+        try:
+            fetched = fetcher(pair, cur_time - newest)
+            trades.extend([trade for trade in fetched if trade.timestamp > newest])
+        except Exception as error:
+            logging.getLogger('debug').error('warm start fetch for {} failed: {}'.format(pair, error))
+
+    recent_trades.store_trades(trades, cur_time)
+    return len(trades)
@@ -0,0 +1,81 @@
+"""
+    Filename: test_candles.py
+    Author: Jim Craveiro <jim.craveiro@gmail.com>
+    Date: 10/17/2026
+
+    Tests of CandleBuilder against bars built by brute force, grouping every trade by period
+"""
+
+import os
+import sys
+import random
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from src.trade import Trade
+from src.candles import CandleBuilder, Candle, RESOLUTIONS
+
+TRADES = 50000
+
+def make_trades(seed):
+    rng       = random.Random(seed)
+    timestamp = 1700000000.0
+    price     = 0.5
+    trades    = []
+    for _ in range(TRADES):
+        # mostly bursts within a second, with the odd quiet stretch that leaves gaps
+        timestamp += rng.expovariate(1.0) if rng.random() < 0.99 else rng.uniform(60, 4000)
+        price     *= 1 + rng.gauss(0, 0.001)
+        trades.append(Trade(timestamp, round(price, 5), rng.uniform(1, 1000)))
+    return trades
+
+def brute_force(trades, resolution):
+    bars = {}
+    for trade in trades:
+        start = trade.timestamp - trade.timestamp % resolution
+        bar   = bars.get(start)
+        if bar == None:
+            bars[start] = [start, trade.price, trade.price, trade.price, trade.price,
+                           trade.amount, trade.price * trade.amount, 1]
+            continue
+        bar[2] = max(bar[2], trade.price)
+        bar[3] = min(bar[3], trade.price)
+        bar[4] = trade.price
+        bar[5] += trade.amount
+        bar[6] += trade.price * trade.amount
+        bar[7] += 1
+    return [Candle(*bar) for start, bar in sorted(bars.items())]
+
+@pytest.fixture(scope='module')
+def built():
+    trades  = make_trades(1)
+    builder = CandleBuilder(history=TRADES)
+    rng     = random.Random(2)
+    index   = 0
+    while index < len(trades):
+        size = rng.choice([1, 1, 1, 10, 500])
+        builder.add_trades(trades[index:index + size])
+        index += size
+    return trades, builder
+
+@pytest.mark.parametrize('resolution', RESOLUTIONS)
+def test_bars_match_brute_force(built, resolution):
+    trades, builder = built
+    expected = brute_force(trades, resolution)
+    bars     = builder.bars(resolution)
+    assert len(bars) == len(expected)
+    for bar, want in zip(bars, expected):
+        assert bar[:5] == want[:5]
+        assert bar.volume == pytest.approx(want.volume)
+        assert bar.price_volume == pytest.approx(want.price_volume)
+        assert bar.count == want.count
+    assert builder.live(resolution) == bars[-1]
+
+def test_history_keeps_the_newest_bars(built):
+    trades, builder = built
+    expected = brute_force(trades, 1)
+    bounded  = CandleBuilder(history=100)
+    bounded.add_trades(trades)
+    bars = bounded.bars(1, live=False)
+    assert len(bars) == 100
+    assert [bar.start for bar in bars] == [bar.start for bar in expected[-101:-1]]
@@ -0,0 +1,137 @@
+"""
+    Filename: test_client.py
+    Author: Jim Craveiro <jim.craveiro@gmail.com>
+    Date: 10/17/2026
+
+    Tests of Client against a fake bitstamp websocket server on localhost, so the
+    connection, routing and reconnect logic can be exercised offline
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import asyncio
+import logging
+import threading
+import pytest
+import websockets
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import src.client
+from src.client import Client
+from src.decoder import JsonDecoder
+from src.recent_trades import RecentTrades
+
+PAIRS   = ['xrpusd', 'btcusd']
+TIMEOUT = 5
+
+"""
+    class used as a fake bitstamp: a websockets server on a free localhost port, run on its own
+    event loop thread. every message a client sends is queued as (connection number, decoded
+    message) and frames can be pushed to the newest connection with send()
+"""
+class FakeBitstamp():
+
+    def __init__(self):
+        self.connections = []
+        self.received    = queue.Queue()
+        self.loop        = asyncio.new_event_loop()
+        self.thread      = threading.Thread(target=self.loop.run_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        self.server      = self.run(self.serve())
+        self.url         = 'ws://127.0.0.1:{}'.format(self.server.sockets[0].getsockname()[1])
+
+    # websockets.serve binds to the running loop, so it has to be called on the server's thread
+    async def serve(self):
+        return await websockets.serve(self.handler, '127.0.0.1', 0)
+
+    def run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result(TIMEOUT)
+
+    async def handler(self, websocket):
+        self.connections.append(websocket)
+        number = len(self.connections) - 1
+        async for message in websocket:
+            self.received.put((number, json.loads(message)))
+
+    def send(self, frame):
+        message = frame if isinstance(frame, str) else json.dumps(frame)
+        self.run(self.connections[-1].send(message))
+
+    """
+        return:
+            (list) - (connection number, message) for the next count messages received
+    """
+    def expect(self, count):
+        return [self.received.get(timeout=TIMEOUT) for _ in range(count)]
+
+    def close(self):
+        self.server.close()
+        self.run(self.server.wait_closed())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(TIMEOUT)
+
+@pytest.fixture
+def bitstamp():
+    server = FakeBitstamp()
+    yield server
+    server.close()
+
+@pytest.fixture
+def client(bitstamp, monkeypatch):
+    monkeypatch.setattr(src.client, 'RECONNECT_DELAY', 0.05)
+    markets = {}
+    for pair in PAIRS:
+        markets[pair] = RecentTrades()
+        markets[pair].add_tracker('1 Hour', 3600)
+    client = Client(markets, url=bitstamp.url, decoder=JsonDecoder())
+    yield client
+    client.stop()
+
+def trade_frame(pair, price, amount=1.0, id=1):
+    now = time.time()
+    return {'event': 'trade', 'channel': 'live_trades_{}'.format(pair),
+            'data': {'id': id, 'timestamp': str(int(now)), 'microtimestamp': str(int(now * 1e6)),
+                     'amount': amount, 'price': price, 'price_str': str(price), 'type': 0}}
+
+def subscriptions(messages):
+    return sorted(message['data']['channel'] for number, message in messages
+                  if message['event'] == 'bts:subscribe')
+
+def wait_for(condition):
+    deadline = time.monotonic() + TIMEOUT
+    while not condition():
+        if time.monotonic() > deadline: raise AssertionError('timed out')
+        time.sleep(0.01)
+
+def test_subscribes_to_every_channel(bitstamp, client):
+    assert subscriptions(bitstamp.expect(len(PAIRS))) == sorted('live_trades_{}'.format(pair) for pair in PAIRS)
+
+def test_routes_trades_to_their_pair(bitstamp, client):
+    bitstamp.expect(len(PAIRS))
+    bitstamp.send(trade_frame('btcusd', 30000.5, 0.25))
+    wait_for(lambda: client.markets['btcusd'].count('1 Hour') == 1)
+    assert client.markets['xrpusd'].count('1 Hour') == 0
+    assert client.markets['btcusd'].snapshot().trackers['1 Hour'].volume == 0.25
+
+def test_skips_malformed_frames(bitstamp, client, caplog):
+    bitstamp.expect(len(PAIRS))
+    with caplog.at_level(logging.ERROR, logger='debug'):
+        bitstamp.send('not json')
+        bitstamp.send({'event': 'trade', 'channel': 'live_trades_xrpusd', 'data': {'id': 1}})
+        bitstamp.send(trade_frame('xrpusd', 0.5))
+        wait_for(lambda: client.markets['xrpusd'].count('1 Hour') == 1)
+    assert len([record for record in caplog.records if 'dropped bitstamp message' in record.getMessage()]) == 2
+    assert len(bitstamp.connections) == 1
+
+def test_reconnects_and_resubscribes_when_asked(bitstamp, client):
+    bitstamp.expect(len(PAIRS))
+    bitstamp.send({'event': 'bts:request_reconnect', 'channel': '', 'data': ''})
+    messages = bitstamp.expect(len(PAIRS))
+    assert all(number == 1 for number, message in messages)
+    assert subscriptions(messages) == sorted('live_trades_{}'.format(pair) for pair in PAIRS)
+    bitstamp.send(trade_frame('xrpusd', 0.5))
+    wait_for(lambda: client.markets['xrpusd'].count('1 Hour') == 1)
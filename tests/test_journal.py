@@ -0,0 +1,43 @@
+"""
+    Filename: test_journal.py
+    Author: Jim Craveiro <jim.craveiro@gmail.com>
+    Date: 10/17/2026
+
+    Tests of Journal's buffering: a pair's partial buffer has to reach disk within
+    flush_interval even while other pairs keep filling buffers
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from src.trade import Trade
+from src.journal import Journal, RECORD, read_since
+
+FLUSH_INTERVAL = 0.1
+
+def test_quiet_pair_is_flushed_while_another_pair_is_busy(tmp_path):
+    path    = str(tmp_path)
+    journal = Journal(path, buffer_size=10 * RECORD.size, flush_interval=FLUSH_INTERVAL)
+    try:
+        journal.append('quiet', Trade(time.time(), 0.5, 1.0, id=1))
+        deadline = time.monotonic() + 10 * FLUSH_INTERVAL
+        written  = []
+        while time.monotonic() < deadline and not written:
+            for _ in range(10):
+                journal.append('busy', Trade(time.time(), 0.5, 1.0))
+            time.sleep(0.001)
+            if os.path.exists(os.path.join(path, 'quiet')): written = read_since(path, 'quiet', 0)
+        assert [trade.id for trade in written] == [1]
+    finally:
+        journal.close()
+
+def test_close_writes_every_buffer(tmp_path):
+    path    = str(tmp_path)
+    journal = Journal(path, flush_interval=60)
+    trades  = [Trade(1000.0 + index, 0.5, 1.0, id=index) for index in range(25)]
+    for trade in trades:
+        journal.append('xrpusd', trade)
+    journal.close()
+    assert [trade.id for trade in read_since(path, 'xrpusd', 0)] == list(range(25))
@@ -0,0 +1,150 @@
+"""
+    Filename: test_notifier.py
+    Author: Jim Craveiro <jim.craveiro@gmail.com>
+    Date: 10/17/2026
+
+    Tests of Notifier against a stub Pushover endpoint, an http.server on a free localhost port
+"""
+
+import os
+import sys
+import time
+import queue
+import threading
+import urllib.parse
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from src.notifier import Notifier
+
+TIMEOUT = 5
+BACKOFF = 0.05
+
+"""
+    class used as a stub Pushover endpoint. every post is queued as (time received, decoded
+    form), and answered with the next status in statuses (200 once they run out). while
+    gate is cleared requests wait on it, which holds the notifier's worker mid-send
+"""
+class StubPushover():
+
+    def __init__(self):
+        self.statuses = []
+        self.posts    = queue.Queue()
+        self.gate     = threading.Event()
+        self.gate.set()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers['Content-Length'])).decode()
+                stub.posts.put((time.monotonic(), dict(urllib.parse.parse_qsl(body))))
+                stub.gate.wait(TIMEOUT)
+                status = stub.statuses.pop(0) if stub.statuses else 200
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.end_headers()
+                self.wfile.write(b'{"status": 1}' if status < 400 else b'{"status": 0}')
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url    = 'http://127.0.0.1:{}/1/messages.json'.format(self.server.server_address[1])
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.05,))
+        self.thread.daemon = True
+        self.thread.start()
+
+    def expect(self, count):
+        return [self.posts.get(timeout=TIMEOUT) for _ in range(count)]
+
+    def assert_quiet(self, wait=0.2):
+        with pytest.raises(queue.Empty):
+            self.posts.get(timeout=wait)
+
+    def close(self):
+        self.gate.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+class FakeClock():
+
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+@pytest.fixture
+def pushover():
+    stub = StubPushover()
+    yield stub
+    stub.close()
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+@pytest.fixture
+def notifier(pushover, clock):
+    notifier = Notifier('token', 'user', url=pushover.url, retries=2, backoff=BACKOFF,
+                        dedupe_window=60.0, clock=clock)
+    yield notifier
+    notifier.stop()
+
+def test_server_errors_are_retried_with_backoff(pushover, notifier):
+    pushover.statuses = [500]
+    assert notifier.notify('price alert', 'title', 'high')
+    (first, failed), (second, accepted) = pushover.expect(2)
+    assert second - first >= BACKOFF
+    assert failed == accepted
+    assert accepted['message'] == 'price alert' and accepted['title'] == 'title'
+    assert accepted['priority'] == '1' and accepted['token'] == 'token' and accepted['user'] == 'user'
+    pushover.assert_quiet()
+
+def test_client_errors_are_not_retried(pushover, notifier):
+    pushover.statuses = [400]
+    assert notifier.notify('bad request')
+    pushover.expect(1)
+    pushover.assert_quiet()
+
+def test_repeats_are_coalesced_and_deduped_by_key(pushover, notifier, clock):
+    # hold the worker on a first notification so the next ones wait on the queue
+    pushover.gate.clear()
+    assert notifier.notify('blocker')
+    pushover.expect(1)
+    for value in [1, 2, 3]:
+        assert notifier.notify('xrpusd price {}'.format(value), key='rule')
+    pushover.gate.set()
+    assert pushover.expect(1)[0][1]['message'] == 'xrpusd price 3 (x3)'
+
+    # sent, so repeats within the window are suppressed, and counted into the next send after it
+    assert not notifier.notify('xrpusd price 4', key='rule')
+    clock.now = 30.0
+    assert not notifier.notify('xrpusd price 5', key='rule')
+    pushover.assert_quiet()
+    clock.now = 61.0
+    assert notifier.notify('xrpusd price 6', key='rule')
+    assert pushover.expect(1)[0][1]['message'] == 'xrpusd price 6 (x3)'
+
+    # long after the last repeat, both the sent time and the suppressed count are forgotten
+    assert not notifier.notify('xrpusd price 7', key='rule')
+    clock.now = 1000.0
+    assert notifier.notify('xrpusd price 8', key='rule')
+    assert pushover.expect(1)[0][1]['message'] == 'xrpusd price 8'
+    assert list(notifier.sent) == ['rule'] and not notifier.suppressed
+
+def test_unknown_priorities_are_rejected(notifier):
+    with pytest.raises(ValueError):
+        notifier.notify('message', priority='urgent')
+
+def test_worker_survives_send_raising(pushover, notifier, monkeypatch):
+    send = notifier.send
+    def failing(message, title, priority):
+        if message == 'boom': raise RuntimeError('boom')
+        return send(message, title, priority)
+    monkeypatch.setattr(notifier, 'send', failing)
+    assert notifier.notify('boom')
+    assert notifier.notify('after')
+    assert pushover.expect(1)[0][1]['message'] == 'after'
+    assert notifier.thread.is_alive()
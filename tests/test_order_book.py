@@ -0,0 +1,85 @@
+"""
+    Filename: test_order_book.py
+    Author: Jim Craveiro <jim.craveiro@gmail.com>
+    Date: 10/17/2026
+
+    Tests of OrderBook: BookSide's bucketed sorted list against a dict of levels, and
+    resyncing on a microtimestamp that goes backwards
+"""
+
+import os
+import sys
+import random
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from src.order_book import BookSide, OrderBook
+
+@pytest.mark.parametrize('descending', [True, False])
+def test_book_side_matches_a_dict_of_levels(descending):
+    rng  = random.Random(int(descending))
+    side = BookSide(descending)
+    # tiny buckets, so they split and empty all the time
+    side.LOAD = 4
+    reference = {}
+    for step in range(20000):
+        price  = round(rng.uniform(0.4, 0.6), 4)
+        amount = rng.choice([0.0, 0.0, rng.uniform(1, 100)])
+        side.update(price, amount)
+        if amount == 0.0: reference.pop(price, None)
+        else: reference[price] = amount
+
+        if step % 250: continue
+        keys = [key for bucket in side.buckets for key in bucket]
+        assert [side.sign * key for key in keys] == sorted(reference, reverse=descending)
+        assert side.maxes == [bucket[-1] for bucket in side.buckets]
+        assert all(1 <= len(bucket) <= 2 * side.LOAD for bucket in side.buckets)
+        assert len(side) == len(reference)
+        assert side.best() == ((max(reference) if descending else min(reference)) if reference else None)
+
+        limits = sorted((rng.uniform(0.4, 0.6) for _ in range(3)), reverse=descending)
+        for limit, depth in zip(limits, side.depths(limits)):
+            expected = sum(amount for price, amount in reference.items()
+                           if (price >= limit if descending else price <= limit))
+            assert depth == pytest.approx(expected)
+
+def test_book_side_empties():
+    side = BookSide(False)
+    side.LOAD = 2
+    for price in range(20):
+        side.update(float(price), 1.0)
+    for price in range(20):
+        side.update(float(price), 0.0)
+    side.update(5.0, 0.0)
+    assert side.buckets == [] and side.maxes == [] and side.best() == None
+
+def diff(microtimestamp, bids=(), asks=()):
+    return {'microtimestamp': str(microtimestamp),
+            'bids': [[str(price), str(amount)] for price, amount in bids],
+            'asks': [[str(price), str(amount)] for price, amount in asks]}
+
+def test_resync_replays_buffered_diffs_newer_than_the_snapshot():
+    snapshot = diff(200, bids=[(1.0, 5), (0.99, 3)], asks=[(1.01, 2), (1.02, 4)])
+    book = OrderBook('xrpusd', fetcher=lambda pair: snapshot, depth_bps=[100, 500])
+    book.load_snapshot(diff(100, bids=[(1.0, 1)], asks=[(1.01, 1)]))
+    book.apply_diff(diff(150, bids=[(1.0, 2)]))
+    assert book.snapshot().synced and book.snapshot().bid == 1.0
+
+    # a microtimestamp going backwards is a gap: the diff is buffered and the book waits for a snapshot
+    book.apply_diff(diff(140, bids=[(0.98, 7)]))
+    assert book.needs_snapshot() and not book.snapshot().synced
+    book.apply_diff(diff(190, asks=[(1.01, 0)]))
+    book.apply_diff(diff(210, bids=[(1.005, 6), (0.99, 0)]))
+    book.apply_diff(diff(220, asks=[(1.03, 1)]))
+    book.apply_diff(diff(220, asks=[(1.02, 0)]))
+
+    book.load_snapshot(book.fetcher('xrpusd'))
+    latest = book.snapshot()
+    assert latest.synced and latest.microtimestamp == 220
+    # diffs at or before the snapshot (140, 190) are dropped, the newer ones replayed
+    assert book.bids.levels == {1.0: 5.0, 1.005: 6.0}
+    assert book.asks.levels == {1.01: 2.0, 1.03: 1.0}
+    assert (latest.bid, latest.ask) == (1.005, 1.01)
+    assert latest.mid == pytest.approx(1.0075)
+    assert latest.depth[100] == pytest.approx((11.0, 2.0))
+    assert latest.depth[500] == pytest.approx((11.0, 3.0))
@@ -0,0 +1,101 @@
+"""
+    Filename: test_order_stats.py
+    Author: Jim Craveiro <jim.craveiro@gmail.com>
+    Date: 10/17/2026
+
+    Tests of the rolling order statistics against brute force over the live window,
+    and of RecentTrades feeding them the same values trade by trade or in batches
+"""
+
+import os
+import sys
+import math
+import random
+import statistics
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from src.clock import SimulatedClock
+from src.trade import Trade, BUY, SELL
+from src.recent_trades import RecentTrades
+from src.order_stats import RollingMin, RollingMax, RollingQuantile, RollingMedian
+
+STEPS = 20000
+
+"""
+    function that drives an indicator through random adds and expiries, window oldest first
+    as a tracker's is, with prices drawn from a few values so there are plenty of duplicates,
+    and compares it to expected(window) after every step
+"""
+def fuzz(indicator, expected, seed):
+    rng    = random.Random(seed)
+    prices = [round(rng.uniform(0.4, 0.6), 2) for _ in range(8)]
+    window = []
+    for step in range(STEPS):
+        # drift between growing and shrinking the window so it both fills and drains to empty
+        grow = 0.7 if (step // 2000) % 2 == 0 else 0.3
+        if window and rng.random() > grow:
+            indicator.expire(window.pop(0))
+        else:
+            price = rng.choice(prices)
+            window.append(price)
+            indicator.update(price)
+        assert indicator.value() == (expected(window) if window else None), step
+
+def nearest_rank(q):
+    return lambda window: sorted(window)[max(int(math.ceil(q * len(window))), 1) - 1]
+
+@pytest.mark.parametrize('q', [0.1, 0.5, 0.9, 1.0])
+def test_rolling_quantile(q):
+    fuzz(RollingQuantile(q), nearest_rank(q), seed=int(q * 10))
+
+def test_rolling_median():
+    fuzz(RollingMedian(), statistics.median, seed=1)
+
+def test_rolling_min():
+    fuzz(RollingMin(), min, seed=2)
+
+def test_rolling_max():
+    fuzz(RollingMax(), max, seed=3)
+
+def test_rolling_quantile_rejects_bad_quantiles():
+    for q in [0.0, -0.5, 1.5]:
+        with pytest.raises(ValueError):
+            RollingQuantile(q)
+
+"""
+    checks that trades stored one at a time and in chunked batches leave every tracker's
+    order statistics at the same values
+"""
+def test_store_trade_and_store_trades_agree():
+    rng    = random.Random(4)
+    trades = []
+    timestamp = 1000.0
+    for _ in range(30000):
+        timestamp += rng.expovariate(2.0)
+        trades.append(Trade(timestamp, round(rng.uniform(0.4, 0.6), 4), rng.uniform(1, 100), rng.choice([BUY, SELL])))
+
+    def make(clock):
+        recent_trades = RecentTrades(clock)
+        recent_trades.add_tracker('15 Min', 900, order_stats=True)
+        recent_trades.add_tracker('1 Hour', 3600, order_stats=True)
+        return recent_trades
+
+    clock  = SimulatedClock(trades[0].timestamp)
+    single = make(clock)
+    for trade in trades:
+        clock.advance(trade.timestamp)
+        single.store_trade(trade)
+
+    batched = make(SimulatedClock(trades[-1].timestamp))
+    for index in range(0, len(trades), 2500):
+        batched.store_trades(trades[index:index + 2500])
+
+    whole = make(SimulatedClock(trades[-1].timestamp))
+    whole.store_trades(trades)
+
+    expected = single.snapshot().trackers
+    for recent_trades in [batched, whole]:
+        for name, tracker in recent_trades.snapshot().trackers.items():
+            assert tracker.count == expected[name].count
+            assert tracker.indicators == expected[name].indicators
@@ -0,0 +1,110 @@
+"""
+    Filename: test_recent_trades_stress.py
+    Author: Jim Craveiro <jim.craveiro@gmail.com>
+    Date: 10/17/2026
+
+    Stress test of RecentTrades' snapshot publishing: several threads store trades one at
+    a time and in batches while readers check that every snapshot they see is consistent
+"""
+
+import os
+import sys
+import math
+import random
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from src.clock import SimulatedClock
+from src.trade import Trade, BUY, SELL
+from src.recent_trades import RecentTrades
+
+WRITERS   = 4
+READERS   = 3
+TRADES    = 5000
+BATCH     = 50
+TIMESTAMP = 1000.0
+# longer than the test runs for in simulated time, so nothing expires
+WINDOWS   = {'short': 3600, 'long': 86400}
+
+def make_trades(seed):
+    rng = random.Random(seed)
+    return [Trade(TIMESTAMP, rng.uniform(0.1, 1.0), rng.uniform(0.001, 1000.0), rng.choice([BUY, SELL]))
+            for _ in range(TRADES)]
+
+def close(a, b):
+    return math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-6)
+
+"""
+    checks that a snapshot is self-consistent: the buy/sell split adds up, and every tracker
+    holds the same trades since none have expired, so a snapshot can't mix two writes
+"""
+def check_snapshot(snapshot):
+    trackers = list(snapshot.trackers.values())
+    for tracker in trackers:
+        assert tracker.count == tracker.buy_count + tracker.sell_count
+        assert close(tracker.volume, tracker.buy_volume + tracker.sell_volume)
+        if tracker.count:
+            assert close(tracker.vwap, tracker.price_volume / tracker.volume)
+    for tracker in trackers[1:]:
+        assert tracker.count == trackers[0].count
+        assert close(tracker.volume, trackers[0].volume)
+
+def test_concurrent_writers_publish_consistent_snapshots():
+    recent_trades = RecentTrades(SimulatedClock(TIMESTAMP))
+    for name, age in WINDOWS.items():
+        recent_trades.add_tracker(name, age)
+
+    batches  = [make_trades(seed) for seed in range(WRITERS)]
+    done     = threading.Event()
+    errors   = []
+    observed = []
+
+    def write(trades, batched):
+        try:
+            if batched:
+                for index in range(0, len(trades), BATCH):
+                    recent_trades.store_trades(trades[index:index + BATCH], TIMESTAMP)
+            else:
+                for trade in trades:
+                    recent_trades.store_trade(trade)
+        except Exception as error:
+            errors.append(error)
+
+    def read():
+        version = -1
+        seen    = 0
+        try:
+            while not done.is_set():
+                snapshot = recent_trades.snapshot()
+                assert snapshot.version >= version
+                version = snapshot.version
+                check_snapshot(snapshot)
+                seen += 1
+        except Exception as error:
+            errors.append(error)
+        observed.append(seen)
+
+    writers = [threading.Thread(target=write, args=(trades, index % 2 == 1))
+               for index, trades in enumerate(batches)]
+    readers = [threading.Thread(target=read) for _ in range(READERS)]
+    for thread in readers + writers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    done.set()
+    for thread in readers:
+        thread.join()
+
+    assert errors == []
+    assert all(seen > 0 for seen in observed)
+
+    trades   = [trade for batch in batches for trade in batch]
+    buys     = [trade for trade in trades if trade.side == BUY]
+    snapshot = recent_trades.snapshot()
+    check_snapshot(snapshot)
+    for tracker in snapshot.trackers.values():
+        assert tracker.count == len(trades)
+        assert tracker.buy_count == len(buys)
+        assert close(tracker.volume, math.fsum(trade.amount for trade in trades))
+        assert close(tracker.price_volume, math.fsum(trade.price * trade.amount for trade in trades))
+        assert close(tracker.buy_volume, math.fsum(trade.amount for trade in buys))